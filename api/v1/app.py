@@ -2,6 +2,7 @@
 """ Flask Application """
 from models import storage
 from api.v1.views import app_views
+from api.v1.serializer import JSONProvider
 from os import environ
 from flask import Flask, render_template, make_response, jsonify
 from flask_cors import CORS
@@ -9,7 +10,9 @@ from flasgger import Swagger
 from flasgger.utils import swag_from
 
 app = Flask(__name__)
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+app.json = JSONProvider(app)
+# stream the JSON lists that are not paginated, one object at a time
+app.config['HBNB_API_STREAM'] = environ.get('HBNB_API_STREAM') == '1'
 app.register_blueprint(app_views)
 cors = CORS(app, resources={r"/*": {"origins": "0.0.0.0"}})
 
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+""" JSON serialization of the API responses """
+from datetime import datetime
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from models import storage
+from models.base_model import BaseModel
+import json
+from os import getenv
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# serialized fields of each model class, the columns of its table in db
+# mode; None in file mode, where the fields are those set on the instance
+_fields = {}
+
+
+def fields(cls):
+    """Returns the serialized fields of the instances of cls, or None"""
+    if cls not in _fields:
+        table = getattr(cls, '__table__', None)
+        _fields[cls] = None if table is None else tuple(
+            column.key for column in table.columns if column.key != 'password')
+    return _fields[cls]
+
+
+def _dict(obj):
+    """
+    Returns the dictionary of obj sent by the API: that of to_dict(), read
+    in db mode from the columns of its class only, leaving out the related
+    objects loaded on the instance
+    """
+    keys = fields(obj.__class__)
+    if keys is None:
+        return obj.to_dict()
+    attrs = obj.__dict__
+    d = {key: attrs[key] for key in keys if key in attrs}
+    for key in ('created_at', 'updated_at'):
+        if type(d.get(key)) is datetime:
+            d[key] = d[key].isoformat(timespec='microseconds')
+    d['__class__'] = obj.__class__.__name__
+    return d
+
+
+def _encoded(obj):
+    """Returns the JSON bytes of the dictionary of obj"""
+    return current_app.json.encode(to_dict(obj))
+
+
+def to_dict(obj):
+    """
+    Returns the dictionary of obj sent by the API, kept by storage until
+    obj changes; it is shared and must not be modified
+    """
+    return storage.cached(obj, _dict)
+
+
+def encoded(obj):
+    """Returns the JSON bytes of to_dict(obj), kept by storage as well"""
+    return storage.cached(obj, _encoded)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Compact JSON, keys in the order of the dictionaries, written by orjson
+    when it is installed unless HBNB_API_JSON is json; models are
+    serialized through to_dict()
+    """
+    sort_keys = False
+    backend = getenv('HBNB_API_JSON', 'orjson' if orjson else 'json')
+
+    def default(self, o):
+        """Serializes the values JSON has no type for"""
+        if isinstance(o, BaseModel):
+            return to_dict(o)
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        """Serializes obj to a JSON string"""
+        if self.backend == 'orjson' and not kwargs:
+            return self.encode(obj).decode()
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def encode(self, obj):
+        """Serializes obj to JSON bytes"""
+        if self.backend == 'orjson':
+            # datetimes go through default() to be formatted as by Flask
+            return orjson.dumps(obj, default=self.default,
+                                option=orjson.OPT_PASSTHROUGH_DATETIME)
+        return self.dumps(obj).encode()
+
+    def response(self, *args, **kwargs):
+        """Returns a response holding the JSON of the arguments"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj) + b'\n',
+                                        mimetype=self.mimetype)
@@ -3,6 +3,8 @@
 from models.amenity import Amenity
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, instance
+from api.v1.views.pagination import paginate
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
@@ -13,11 +15,7 @@ def get_amenities():
     """
     Retrieves a list of all amenities
     """
-    all_amenities = storage.all(Amenity).values()
-    list_amenities = []
-    for amenity in all_amenities:
-        list_amenities.append(amenity.to_dict())
-    return jsonify(list_amenities)
+    return paginate(Amenity)
 
 
 @app_views.route('/amenities/<amenity_id>/', methods=['GET'],
@@ -29,7 +27,8 @@ def get_amenity(amenity_id):
     if not amenity:
         abort(404)
 
-    return jsonify(amenity.to_dict())
+    return conditional(instance(amenity),
+                       lambda: jsonify(amenity.to_dict()))
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['DELETE'],
@@ -90,5 +89,5 @@ def put_amenity(amenity_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(amenity, key, value)
-    storage.save()
+    amenity.save()
     return make_response(jsonify(amenity.to_dict()), 200)
@@ -4,6 +4,8 @@ from models.city import City
 from models.state import State
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, instance
+from api.v1.views.pagination import paginate
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
@@ -16,14 +18,11 @@ def get_cities(state_id):
     Retrieves the list of all cities objects
     of a specific State, or a specific city
     """
-    list_cities = []
     state = storage.get(State, state_id)
     if not state:
         abort(404)
-    for city in state.cities:
-        list_cities.append(city.to_dict())
 
-    return jsonify(list_cities)
+    return paginate(City, "state_id", state.id)
 
 
 @app_views.route('/cities/<city_id>/', methods=['GET'], strict_slashes=False)
@@ -35,7 +34,8 @@ def get_city(city_id):
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    return jsonify(city.to_dict())
+    return conditional(instance(city),
+                       lambda: jsonify(city.to_dict()))
 
 
 @app_views.route('/cities/<city_id>', methods=['DELETE'], strict_slashes=False)
@@ -95,5 +95,5 @@ def put_city(city_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(city, key, value)
-    storage.save()
+    city.save()
     return make_response(jsonify(city.to_dict()), 200)
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+""" validators of the API responses and conditional GET """
+from datetime import datetime, timedelta
+from models import storage
+from flask import current_app, make_response, request
+from hashlib import md5
+from werkzeug.http import is_resource_modified
+
+
+def tag(*parts):
+    """Returns the entity tag of parts"""
+    return md5(" ".join(map(str, parts)).encode()).hexdigest()
+
+
+def collection(*classes):
+    """
+    Returns the entity tag and the last modification time, None when
+    storage does not know it, of the objects of classes as listed by the
+    request, or of every object when there are none
+    """
+    versions = [storage.version(cls) for cls in classes]
+    if not versions:
+        versions = [storage.version()]
+    times = [time for _, time in versions]
+    return (tag(request.full_path, *[version for version, _ in versions]),
+            None if None in times else max(times))
+
+
+def instance(obj):
+    """
+    Returns the entity tag and the last modification time of obj; the tag
+    holds the version of its class, which changes with obj even when the
+    database keeps updated_at to the second
+    """
+    return (tag(obj.__class__.__name__, obj.id, obj.updated_at,
+                storage.version(obj.__class__)[0]),
+            obj.updated_at)
+
+
+def conditional(validators, build):
+    """
+    Returns 304 Not Modified, without calling build, when the entity tag
+    and last modification time of validators match the If-None-Match or
+    If-Modified-Since of the request, else the response returned by build;
+    both carry the validators and must be revalidated by caches
+    """
+    etag, modified = validators
+    if modified is not None and datetime.utcnow() - modified < timedelta(
+            seconds=1):
+        # sent once a second has passed, as HTTP dates count whole seconds
+        # and a later change within the same one would keep the same date
+        modified = None
+    if request.method in ('GET', 'HEAD') and not is_resource_modified(
+            request.environ, etag, last_modified=modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build())
+    response.set_etag(etag, weak=True)
+    if modified is not None:
+        response.last_modified = modified
+    response.cache_control.no_cache = True
+    return response
@@ -8,7 +8,8 @@ from models.state import State
 from models.user import User
 from models import storage
 from api.v1.views import app_views
-from flask import jsonify
+from api.v1.views.conditional import collection, conditional
+from flask import abort, jsonify
 
 
 @app_views.route('/status', methods=['GET'], strict_slashes=False)
@@ -23,8 +24,20 @@ def number_objects():
     classes = [Amenity, City, Place, Review, State, User]
     names = ["amenities", "cities", "places", "reviews", "states", "users"]
 
-    num_objs = {}
-    for i in range(len(classes)):
-        num_objs[names[i]] = storage.count(classes[i])
+    def build():
+        """counts the objects of each class"""
+        counts = storage.counts()
+        num_objs = {}
+        for i in range(len(classes)):
+            num_objs[names[i]] = counts.get(classes[i].__name__, 0)
+        return jsonify(num_objs)
 
-    return jsonify(num_objs)
+    return conditional(collection(*classes), build)
+
+
+@app_views.route('/stats/pool', methods=['GET'], strict_slashes=False)
+def pool_stats():
+    """ Retrieves the metrics of the database connection pool """
+    if not hasattr(storage, 'pool_stats'):
+        abort(404)
+    return jsonify(storage.pool_stats())
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+""" pagination and field projection of the list endpoints """
+from api.v1.serializer import encoded, to_dict
+from api.v1.views.conditional import collection, conditional
+from bisect import bisect_right
+from models import storage
+from flask import abort, current_app, request, stream_with_context
+from urllib.parse import urlencode
+
+# objects read from storage at a time by a streamed response, doubling
+# from CHUNK up to CHUNK_MAX
+CHUNK = 1000
+CHUNK_MAX = 16000
+
+
+def page_args():
+    """
+    Returns the limit, cursor and fields of the query string: at most
+    limit objects are listed, those whose id follows the cursor, with only
+    the comma separated fields
+    """
+    limit = request.args.get('limit', None)
+    if limit is not None:
+        if not limit.isdigit() or int(limit) < 1:
+            abort(400, description="Not a valid limit")
+        limit = int(limit)
+    cursor = request.args.get('cursor', None)
+    fields = request.args.get('fields', None)
+    if fields is not None:
+        fields = [field for field in fields.split(',') if field]
+    return limit, cursor, fields
+
+
+def project(obj, fields, skip=()):
+    """Returns the dictionary of obj with only fields, without skip"""
+    d = to_dict(obj)
+    if any(key in d for key in skip):
+        d = {key: value for key, value in d.items() if key not in skip}
+    if fields is not None:
+        d = {field: d[field] for field in fields if field in d}
+    return d
+
+
+def dump(obj, fields, skip=()):
+    """
+    Returns the JSON bytes of project(obj, fields, skip), those cached for
+    obj when nothing is left out
+    """
+    if fields is None and not any(key in to_dict(obj) for key in skip):
+        return encoded(obj)
+    return current_app.json.encode(project(obj, fields, skip))
+
+
+def streaming():
+    """Tells whether unpaginated lists are streamed (HBNB_API_STREAM)"""
+    return current_app.config.get('HBNB_API_STREAM', False)
+
+
+def stream(objs, fields, skip=()):
+    """
+    Returns a response streaming the JSON list of the objects yielded by
+    objs, one line per object serialized as it is reached
+    """
+    def generate():
+        """yields the JSON list a piece at a time"""
+        separator = b'[\n'
+        for obj in objs:
+            yield separator + dump(obj, fields, skip)
+            separator = b',\n'
+        yield b'[]\n' if separator == b'[\n' else b'\n]\n'
+    return current_app.response_class(stream_with_context(generate()),
+                                      mimetype='application/json')
+
+
+def walk(cls, attr=None, value=None, after=None):
+    """yields the objects page() returns, reading a chunk at a time"""
+    chunk = CHUNK
+    while True:
+        objs = storage.page(cls, chunk, after, attr, value)
+        yield from objs
+        if len(objs) < chunk:
+            return
+        after = objs[-1].id
+        chunk = min(chunk * 2, CHUNK_MAX)
+
+
+def listing(objs, limit, fields, skip=()):
+    """
+    Returns the JSON list of objs projected on fields, without the keys
+    of skip; objs holds one object more than limit when there is a next
+    page, linked to by the Link header
+    """
+    more = limit is not None and len(objs) > limit
+    if more:
+        objs = objs[:limit]
+    if limit is None and streaming():
+        return stream(objs, fields, skip)
+    response = current_app.response_class(
+        b'[' + b','.join(dump(obj, fields, skip) for obj in objs) + b']\n',
+        mimetype='application/json')
+    if more:
+        args = request.args.to_dict()
+        args['cursor'] = objs[-1].id
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response
+
+
+def paginate(cls, attr=None, value=None):
+    """
+    Returns the JSON list of the objects of cls, or of those whose attr
+    equals value, in the order of their ids, read a page at a time from
+    storage; or 304 Not Modified while the objects of cls are unchanged
+    """
+    def build():
+        """reads the page and serializes it"""
+        limit, cursor, fields = page_args()
+        if limit is None and streaming():
+            return stream(walk(cls, attr, value, cursor), fields)
+        objs = storage.page(cls, None if limit is None else limit + 1,
+                            cursor, attr, value)
+        return listing(objs, limit, fields)
+    return conditional(collection(cls), build)
+
+
+def paginate_list(objs, ordered=False, skip=()):
+    """
+    Returns the JSON list of objs, a page at a time: sorted by id unless
+    ordered, in which case the cursor must be the id of one of them
+    """
+    limit, cursor, fields = page_args()
+    if not ordered:
+        objs = sorted(objs, key=lambda obj: obj.id)
+    start = 0
+    if cursor is not None and not ordered:
+        start = bisect_right([obj.id for obj in objs], cursor)
+    elif cursor is not None:
+        ids = [obj.id for obj in objs]
+        if cursor not in ids:
+            abort(400, description="Not a valid cursor")
+        start = ids.index(cursor) + 1
+    stop = None if limit is None else start + limit + 1
+    return listing(objs[start:stop], limit, fields, skip)
@@ -1,15 +1,19 @@
 #!/usr/bin/python3
 """ objects that handle all default RestFul API actions for Places """
-from models.state import State
 from models.city import City
 from models.place import Place
 from models.user import User
-from models.amenity import Amenity
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, instance
+from api.v1.views.pagination import paginate, paginate_list
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
+# numeric fields places_search filters by range and sorts on
+numeric_fields = ("number_rooms", "number_bathrooms", "max_guest",
+                  "price_by_night", "latitude", "longitude")
+
 
 @app_views.route('/cities/<city_id>/places', methods=['GET'],
                  strict_slashes=False)
@@ -23,9 +27,7 @@ def get_places(city_id):
     if not city:
         abort(404)
 
-    places = [place.to_dict() for place in city.places]
-
-    return jsonify(places)
+    return paginate(Place, "city_id", city.id)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'], strict_slashes=False)
@@ -38,7 +40,8 @@ def get_place(place_id):
     if not place:
         abort(404)
 
-    return jsonify(place.to_dict())
+    return conditional(instance(place),
+                       lambda: jsonify(place.to_dict()))
 
 
 @app_views.route('/places/<place_id>', methods=['DELETE'],
@@ -113,7 +116,7 @@ def put_place(place_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(place, key, value)
-    storage.save()
+    place.save()
     return make_response(jsonify(place.to_dict()), 200)
 
 
@@ -130,51 +133,30 @@ def places_search():
 
     data = request.get_json()
 
+    states = cities = amenities = None
     if data and len(data):
         states = data.get('states', None)
         cities = data.get('cities', None)
         amenities = data.get('amenities', None)
 
-    if not data or not len(data) or (
-            not states and
-            not cities and
-            not amenities):
-        places = storage.all(Place).values()
-        list_places = []
-        for place in places:
-            list_places.append(place.to_dict())
-        return jsonify(list_places)
-
-    list_places = []
-    if states:
-        states_obj = [storage.get(State, s_id) for s_id in states]
-        for state in states_obj:
-            if state:
-                for city in state.cities:
-                    if city:
-                        for place in city.places:
-                            list_places.append(place)
-
-    if cities:
-        city_obj = [storage.get(City, c_id) for c_id in cities]
-        for city in city_obj:
-            if city:
-                for place in city.places:
-                    if place not in list_places:
-                        list_places.append(place)
-
-    if amenities:
-        if not list_places:
-            list_places = storage.all(Place).values()
-        amenities_obj = [storage.get(Amenity, a_id) for a_id in amenities]
-        list_places = [place for place in list_places
-                       if all([am in place.amenities
-                               for am in amenities_obj])]
-
-    places = []
-    for p in list_places:
-        d = p.to_dict()
-        d.pop('amenities', None)
-        places.append(d)
-
-    return jsonify(places)
+    ranges = {}
+    order = None
+    reverse = False
+    for field in numeric_fields:
+        bounds = data.get(field, None) if data else None
+        if bounds is None:
+            continue
+        if type(bounds) is not list or len(bounds) != 2 or not all(
+                bound is None or type(bound) in (int, float)
+                for bound in bounds):
+            abort(400, description="Not a valid range")
+        ranges[field] = tuple(bounds)
+    if data and data.get('sort', None):
+        order = str(data['sort']).lstrip('-')
+        reverse = str(data['sort']).startswith('-')
+        if order not in numeric_fields:
+            abort(400, description="Not a valid sort")
+
+    places = storage.search(states, cities, amenities, ranges, order, reverse)
+    return paginate_list(places, ordered=order is not None,
+                         skip=('amenities',))
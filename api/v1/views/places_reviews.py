@@ -5,6 +5,8 @@ from models.place import Place
 from models.user import User
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, instance
+from api.v1.views.pagination import paginate
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
@@ -21,9 +23,7 @@ def get_reviews(place_id):
     if not place:
         abort(404)
 
-    reviews = [review.to_dict() for review in place.reviews]
-
-    return jsonify(reviews)
+    return paginate(Review, "place_id", place.id)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'], strict_slashes=False)
@@ -36,7 +36,8 @@ def get_review(review_id):
     if not review:
         abort(404)
 
-    return jsonify(review.to_dict())
+    return conditional(instance(review),
+                       lambda: jsonify(review.to_dict()))
 
 
 @app_views.route('/reviews/<review_id>', methods=['DELETE'],
@@ -111,5 +112,5 @@ def put_review(review_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(review, key, value)
-    storage.save()
+    review.save()
     return make_response(jsonify(review.to_dict()), 200)
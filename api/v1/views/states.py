@@ -3,6 +3,8 @@
 from models.state import State
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, instance
+from api.v1.views.pagination import paginate
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
@@ -13,11 +15,7 @@ def get_states():
     """
     Retrieves the list of all State objects
     """
-    all_states = storage.all(State).values()
-    list_states = []
-    for state in all_states:
-        list_states.append(state.to_dict())
-    return jsonify(list_states)
+    return paginate(State)
 
 
 @app_views.route('/states/<state_id>', methods=['GET'], strict_slashes=False)
@@ -28,7 +26,8 @@ def get_state(state_id):
     if not state:
         abort(404)
 
-    return jsonify(state.to_dict())
+    return conditional(instance(state),
+                       lambda: jsonify(state.to_dict()))
 
 
 @app_views.route('/states/<state_id>', methods=['DELETE'],
@@ -88,5 +87,5 @@ def put_state(state_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(state, key, value)
-    storage.save()
+    state.save()
     return make_response(jsonify(state.to_dict()), 200)
@@ -3,6 +3,8 @@
 from models.user import User
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, instance
+from api.v1.views.pagination import paginate
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
@@ -14,11 +16,7 @@ def get_users():
     Retrieves the list of all user objects
     or a specific user
     """
-    all_users = storage.all(User).values()
-    list_users = []
-    for user in all_users:
-        list_users.append(user.to_dict())
-    return jsonify(list_users)
+    return paginate(User)
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
@@ -29,7 +27,8 @@ def get_user(user_id):
     if not user:
         abort(404)
 
-    return jsonify(user.to_dict())
+    return conditional(instance(user),
+                       lambda: jsonify(user.to_dict()))
 
 
 @app_views.route('/users/<user_id>', methods=['DELETE'],
@@ -91,5 +90,5 @@ def put_user(user_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(user, key, value)
-    storage.save()
+    user.save()
     return make_response(jsonify(user.to_dict()), 200)
@@ -11,7 +11,8 @@ from sqlalchemy import Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 
-time = "%Y-%m-%dT%H:%M:%S.%f"
+# file mode keeps the attributes of the instances in __slots__
+compact = models.storage_t != "db" and getenv("HBNB_FS_COMPACT") == "1"
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -19,7 +20,41 @@ else:
     Base = object
 
 
-class BaseModel:
+class Compact(type):
+    """
+    Metaclass of the models in compact mode: the class attributes holding
+    plain values become the _defaults of the class, and its instances keep
+    them in __slots__ instead of a __dict__
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        """moves the defaults of namespace to _defaults and slots them"""
+        defaults = {}
+        fields = []
+        for base in reversed(bases):
+            defaults.update(getattr(base, "_defaults", {}))
+            fields += [field for field in getattr(base, "_fields", ())
+                       if field not in fields]
+        for key, value in list(namespace.items()):
+            if not key.startswith("_") and not hasattr(value, "__get__"):
+                defaults[key] = namespace.pop(key)
+        slots = list(namespace.get("__slots__", ()))
+        slots += [key for key in defaults
+                  if key not in fields and key not in slots]
+        namespace["__slots__"] = tuple(slots)
+        namespace["_defaults"] = defaults
+        namespace["_fields"] = tuple(fields + [slot for slot in slots
+                                               if not slot.startswith("_")])
+        return super().__new__(mcs, name, bases, namespace)
+
+
+if compact:
+    Meta = Compact
+else:
+    Meta = type
+
+
+class BaseModel(metaclass=Meta):
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
@@ -33,12 +68,12 @@ class BaseModel:
                 if key != "__class__":
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
+                self.created_at = datetime.fromisoformat(kwargs["created_at"])
+            elif type(kwargs.get("created_at", None)) is not datetime:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
+                self.updated_at = datetime.fromisoformat(kwargs["updated_at"])
+            elif type(kwargs.get("updated_at", None)) is not datetime:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
                 self.id = str(uuid.uuid4())
@@ -47,10 +82,86 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    @classmethod
+    def from_dict(cls, record):
+        """
+        builds an instance from a record returned by to_dict(save_fs=1),
+        setting its attributes directly instead of through __setattr__
+        """
+        attrs = {}
+        for key, value in record.items():
+            if key in ("created_at", "updated_at") and type(value) is str:
+                value = datetime.fromisoformat(value)
+            if key != "__class__":
+                attrs[key] = value
+        if models.storage_t == "db":
+            obj = cls()
+        else:
+            obj = cls.__new__(cls)
+        for key, value in attrs.items():
+            obj.__set(key, value)
+        return obj
+
+    if compact:
+        __slots__ = ("_extra", "id", "created_at", "updated_at")
+
+        def __getattr__(self, name):
+            """returns the default of a field never set, or an extra attr"""
+            if name in self._defaults:
+                return self._defaults[name]
+            if name != "_extra" and name in getattr(self, "_extra", ()):
+                return self._extra[name]
+            raise AttributeError("'{}' object has no attribute '{}'"
+                                 .format(self.__class__.__name__, name))
+
+        def __set(self, name, value):
+            """sets a slot, or an extra attribute the class has no slot for"""
+            try:
+                object.__setattr__(self, name, value)
+            except AttributeError:
+                if hasattr(self.__class__, name):
+                    raise
+                try:
+                    extra = object.__getattribute__(self, "_extra")
+                except AttributeError:
+                    extra = {}
+                    object.__setattr__(self, "_extra", extra)
+                extra[name] = value
+
+        def __attrs(self):
+            """returns the attributes set on the instance"""
+            attrs = {}
+            for name in ("_extra",) + self._fields:
+                try:
+                    attrs[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+            attrs.update(attrs.pop("_extra", {}))
+            return attrs
+
+        # read-only snapshot of the attributes, for the callers of vars()
+        __dict__ = property(__attrs)
+    else:
+        def __set(self, name, value):
+            """sets an attribute without going through __setattr__"""
+            object.__setattr__(self, name, value)
+
+        def __attrs(self):
+            """returns the attributes set on the instance"""
+            return self.__dict__
+
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and keeps the storage indexes in sync"""
+            old = self.__attrs().get(name)
+            self.__set(name, value)
+            if old != value:
+                models.storage.changed(self, name, old)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
-                                         self.__dict__)
+                                         self.__attrs())
 
     def save(self):
         """updates the attribute 'updated_at' with the current datetime"""
@@ -60,11 +171,13 @@ class BaseModel:
 
     def to_dict(self, save_fs=None):
         """returns a dictionary containing all keys/values of the instance"""
-        new_dict = self.__dict__.copy()
+        new_dict = self.__attrs().copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            new_dict["created_at"] = new_dict["created_at"].isoformat(
+                timespec="microseconds")
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+            new_dict["updated_at"] = new_dict["updated_at"].isoformat(
+                timespec="microseconds")
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
@@ -12,7 +12,8 @@ class City(BaseModel, Base):
     """Representation of city """
     if models.storage_t == "db":
         __tablename__ = 'cities'
-        state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
+        state_id = Column(String(60), ForeignKey('states.id'), nullable=False,
+                          index=True)
         name = Column(String(128), nullable=False)
         places = relationship("Place",
                               backref="cities",
@@ -24,3 +25,11 @@ class City(BaseModel, Base):
     def __init__(self, *args, **kwargs):
         """initializes city"""
         super().__init__(*args, **kwargs)
+
+    if models.storage_t != "db":
+        @property
+        def places(self):
+            """getter attribute returns the list of Place instances"""
+            from models.place import Place
+            return list(models.storage.related(Place, "city_id",
+                                               self.id).values())
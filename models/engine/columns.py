@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+"""
+Contains the Columns class, the columnar mirror of numeric fields kept by
+FileStorage
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from math import inf, nan
+
+
+def number(value):
+    """returns value as a float, or NaN when it is not a number"""
+    if type(value) is bool:
+        return nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return nan
+
+
+def select(values, ranges, order=None, reverse=False, rows=None):
+    """
+    returns the positions of the rows of values, a mapping of fields to
+    sequences of numbers, whose fields lie within the (min, max) pairs of
+    ranges, None meaning unbounded; the rows are sorted by the field order
+    if given, those without a number last; rows restricts the positions
+    looked at
+    """
+    for field, (lo, hi) in ranges.items():
+        lo = -inf if lo is None else lo
+        hi = inf if hi is None else hi
+        column = values[field]
+        if rows is None:
+            rows = [i for i, v in enumerate(column) if lo <= v <= hi]
+        else:
+            rows = [i for i in rows if lo <= column[i] <= hi]
+    if order is not None:
+        column = list(values[order])
+        if rows is None:
+            rows = range(len(column))
+        # NaN is the only value not equal to itself
+        missing = [i for i in rows if column[i] != column[i]]
+        rows = sorted((i for i in rows if column[i] == column[i]),
+                      key=column.__getitem__, reverse=reverse)
+        rows += missing
+    return rows
+
+
+class Columns:
+    """
+    The numeric fields of the objects of a class, an array of doubles per
+    field and a row per object, plus the values of each field kept sorted
+    with their rows for range lookups by binary search; rows freed by
+    deleted objects are NaN and reused
+    """
+
+    def __init__(self, fields):
+        """initializes empty columns for fields"""
+        self.fields = fields
+        self.values = {field: array("d") for field in fields}
+        self.sorted = {field: (array("d"), array("q")) for field in fields}
+        self.keys = []
+        self.rows = {}
+        self.free = []
+
+    def __insert(self, field, row, value):
+        """sets the value of field in row and in the sorted values"""
+        self.values[field][row] = value
+        if value == value:
+            values, rows = self.sorted[field]
+            i = bisect_right(values, value)
+            values.insert(i, value)
+            rows.insert(i, row)
+
+    def __delete(self, field, row):
+        """takes the value of field in row out of the sorted values"""
+        value = self.values[field][row]
+        self.values[field][row] = nan
+        if value == value:
+            values, rows = self.sorted[field]
+            lo = bisect_left(values, value)
+            hi = bisect_right(values, value, lo)
+            i = lo + rows[lo:hi].index(row)
+            del values[i]
+            del rows[i]
+
+    def extend(self, items):
+        """stores the (key, obj) pairs of items in new rows, sorting once"""
+        for key, obj in items:
+            self.rows[key] = len(self.keys)
+            self.keys.append(key)
+            for field in self.fields:
+                self.values[field].append(number(getattr(obj, field, None)))
+        for field in self.fields:
+            column = self.values[field]
+            rows = sorted((i for i, value in enumerate(column)
+                           if value == value), key=column.__getitem__)
+            self.sorted[field] = (array("d", map(column.__getitem__, rows)),
+                                  array("q", rows))
+
+    def put(self, key, obj):
+        """stores the fields of obj in the row of key"""
+        row = self.rows.get(key)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+                self.keys[row] = key
+            else:
+                row = len(self.keys)
+                self.keys.append(key)
+                for column in self.values.values():
+                    column.append(nan)
+            self.rows[key] = row
+        for field in self.fields:
+            self.update(key, field, getattr(obj, field, None))
+
+    def update(self, key, field, value):
+        """stores the new value of field in the row of key"""
+        row = self.rows.get(key)
+        if row is None or field not in self.values:
+            return
+        value = number(value)
+        old = self.values[field][row]
+        if value != old and (value == value or old == old):
+            self.__delete(field, row)
+            self.__insert(field, row, value)
+
+    def remove(self, key):
+        """frees the row of key"""
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        self.keys[row] = None
+        for field in self.fields:
+            self.__delete(field, row)
+        self.free.append(row)
+
+    def query(self, ranges, order=None, reverse=False):
+        """
+        returns the keys of the rows whose fields lie within the (min, max)
+        pairs of ranges, None meaning unbounded, sorted by the field order
+        if given, those without a number last; the rows of the narrowest
+        range are found by binary search and checked against the others
+        """
+        rows = None
+        for field, (lo, hi) in ranges.items():
+            values, ordered = self.sorted[field]
+            start = 0 if lo is None else bisect_left(values, lo)
+            stop = len(values) if hi is None else bisect_right(values, hi)
+            if rows is None or stop - start < len(rows):
+                rows, narrowest = ordered[start:stop], field
+        if rows is not None:
+            others = {field: bounds for field, bounds in ranges.items()
+                      if field != narrowest}
+            rows = select({field: self.values[field] for field in others},
+                          others, rows=rows)
+            if order is not None:
+                rows = select({order: self.values[order]}, {}, order,
+                              reverse, rows)
+            else:
+                rows = sorted(rows)
+        elif order is not None:
+            rows = list(self.sorted[order][1])
+            if reverse:
+                rows.reverse()
+            if len(rows) < len(self.rows):
+                column = self.values[order]
+                rows += [i for i, key in enumerate(self.keys)
+                         if key is not None and column[i] != column[i]]
+        else:
+            rows = range(len(self.keys))
+        return [self.keys[i] for i in rows if self.keys[i] is not None]
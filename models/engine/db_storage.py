@@ -3,27 +3,110 @@
 Contains the class DBStorage
 """
 
-import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.write_behind import WriteBehind
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import make_transient, make_transient_to_detached
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# pragmas set on every SQLite connection: concurrent readers with one
+# writer through the write-ahead log, fsync at checkpoints only, and the
+# foreign keys enforced so that deleting a place or an amenity cascades
+# to its place_amenity rows as it does on MySQL
+sqlite_pragmas = (("journal_mode", "WAL"), ("synchronous", "NORMAL"),
+                  ("foreign_keys", "ON"), ("busy_timeout", 5000),
+                  ("cache_size", -16000), ("temp_store", "MEMORY"),
+                  ("mmap_size", 1 << 28))
+
+# number of changes committed to the objects of each class name, counted
+# in the transaction of the changes so that every process reads the same
+versions = sqlalchemy.Table(
+    "versions", sqlalchemy.MetaData(),
+    sqlalchemy.Column("name", sqlalchemy.String(60), primary_key=True),
+    sqlalchemy.Column("count", sqlalchemy.Integer, nullable=False))
+
+# loader of each relationship named by the eager paths of all() and get():
+# selectin loads the related objects of all the parents with one more
+# IN query, joined with a LEFT OUTER JOIN in the query of the parents
+eager_loading = {"State.cities": "selectin", "City.places": "selectin",
+                 "Place.amenities": "selectin", "Place.reviews": "selectin",
+                 "Place.user": "joined", "Review.user": "joined"}
+
+
+def _sqlite_connect(connection, record):
+    """applies sqlite_pragmas to a new SQLite connection"""
+    cursor = connection.cursor()
+    for name, value in sqlite_pragmas:
+        cursor.execute("PRAGMA {} = {}".format(name, value))
+    cursor.close()
+
+
+class TimedPool(sqlalchemy.pool.QueuePool):
+    """QueuePool that keeps how long checkouts waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        """creates the pool with empty wait statistics"""
+        super().__init__(*args, **kwargs)
+        self.waits = {"checkouts": 0, "timeouts": 0, "wait_ms": 0.0,
+                      "max_wait_ms": 0.0, "max_checked_out": 0}
+        self.waits_lock = threading.Lock()
+
+    def _do_get(self):
+        """checks a connection out, timing the wait for it"""
+        start = time.monotonic()
+        timeout = False
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            timeout = True
+            raise
+        finally:
+            waited = (time.monotonic() - start) * 1000
+            with self.waits_lock:
+                self.waits["checkouts"] += 1
+                self.waits["timeouts"] += timeout
+                self.waits["wait_ms"] += waited
+                self.waits["max_wait_ms"] = max(self.waits["max_wait_ms"],
+                                                waited)
+                self.waits["max_checked_out"] = max(
+                    self.waits["max_checked_out"], self.checkedout())
 
 
 class DBStorage:
-    """interaacts with the MySQL database"""
+    """interaacts with the MySQL database, or any other of HBNB_DB_URL"""
     __engine = None
     __session = None
+    # dictionary - (version of the class, {build: value}) by <class
+    # name>.id, the values computed by cached() for every session
+    __cache = None
+    # int - milliseconds the saves of every session may wait to be
+    # committed together by __writer, 0 commits each session on its save
+    __batch_ms = int(getenv("HBNB_DB_BATCH_MS", 0))
+    __behind = WriteBehind()
+    # session the saves are moved to in batched mode, used under __writing
+    __writer = None
+    __writing = threading.Lock()
+    # connections kept open, extra connections opened under load, seconds
+    # to wait for one before failing, seconds after which a connection is
+    # replaced (below the wait_timeout of MySQL), and whether to test each
+    # connection before handing it out
+    __pool_size = int(getenv("HBNB_DB_POOL_SIZE", 5))
+    __max_overflow = int(getenv("HBNB_DB_MAX_OVERFLOW", 10))
+    __pool_timeout = float(getenv("HBNB_DB_POOL_TIMEOUT", 30))
+    __pool_recycle = int(getenv("HBNB_DB_POOL_RECYCLE", 3600))
+    __pre_ping = getenv("HBNB_DB_PRE_PING") == "1"
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -32,20 +115,84 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        # SQLAlchemy URL of the database, e.g. sqlite:///hbnb.db
+        HBNB_DB_URL = getenv('HBNB_DB_URL')
+        if not HBNB_DB_URL:
+            HBNB_DB_URL = 'mysql+mysqldb://{}:{}@{}/{}'.format(
+                HBNB_MYSQL_USER, HBNB_MYSQL_PWD, HBNB_MYSQL_HOST,
+                HBNB_MYSQL_DB)
+        options = {"poolclass": TimedPool, "pool_size": self.__pool_size,
+                   "max_overflow": self.__max_overflow,
+                   "pool_timeout": self.__pool_timeout,
+                   "pool_recycle": self.__pool_recycle,
+                   "pool_pre_ping": self.__pre_ping}
+        url = sqlalchemy.engine.make_url(HBNB_DB_URL)
+        if url.get_backend_name() == "sqlite" and url.database in (
+                None, "", ":memory:"):
+            # a single connection, or each thread would get its own database
+            options = {"poolclass": sqlalchemy.pool.StaticPool,
+                       "connect_args": {"check_same_thread": False}}
+        self.__engine = create_engine(url, **options)
+        self.__cache = {}
+        if self.__engine.dialect.name == "sqlite":
+            event.listen(self.__engine, "connect", _sqlite_connect)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
+            versions.metadata.drop_all(self.__engine)
+
+    def pool_stats(self):
+        """
+        returns the size of the connection pool, the connections checked
+        in and out, the overflow beyond the size, and how many checkouts
+        there were, timed out and waited in total and at most, and the
+        most connections checked out at once
+        """
+        pool = self.__engine.pool
+        stats = {"pool": pool.__class__.__name__}
+        if isinstance(pool, sqlalchemy.pool.QueuePool):
+            stats.update(size=pool.size(), checked_in=pool.checkedin(),
+                         checked_out=pool.checkedout(),
+                         overflow=max(pool.overflow(), 0),
+                         max_overflow=self.__max_overflow)
+        if isinstance(pool, TimedPool):
+            with pool.waits_lock:
+                stats.update(pool.waits)
+        return stats
+
+    def options(self, cls, *eager):
+        """
+        returns the loader options of the relationship paths of eager, such
+        as "cities.places" from State, loaded as eager_loading says
+        """
+        options = []
+        for path in eager:
+            option = None
+            owner = cls
+            for name in path.split("."):
+                attr = getattr(owner, name)
+                strategy = eager_loading.get(owner.__name__ + "." + name,
+                                             "selectin") + "load"
+                if option is None:
+                    option = getattr(sqlalchemy.orm, strategy)(attr)
+                else:
+                    option = getattr(option, strategy)(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, *eager):
+        """
+        query on the current database session, loading the relationship
+        paths of eager along with the objects of cls
+        """
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                query = self.__session.query(classes[clss])
+                if eager:
+                    query = query.options(*self.options(classes[clss],
+                                                        *eager))
+                objs = query.all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
@@ -55,9 +202,50 @@ class DBStorage:
         """add the object to the current database session"""
         self.__session.add(obj)
 
-    def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+    def save(self, wait=True):
+        """
+        commit all changes of the current database session; in batched
+        mode they are moved to the writer session, which commits at once
+        those of every session saved in the next HBNB_DB_BATCH_MS, and
+        save waits for that commit unless wait=False
+        """
+        if self.__batch_ms <= 0:
+            self.__session.commit()
+            return
+        session = self.__session()
+        changed = list(session.new) + list(session.dirty)
+        deleted = list(session.deleted)
+        with self.__writing:
+            # a savepoint, so that changes that fail are rolled back alone
+            # and raised here rather than in the commit of the batch
+            with self.__writer.begin_nested():
+                for obj in changed:
+                    self.__writer.merge(obj)
+                # the writer's own copies, deleted once each: those of the
+                # children are deleted already by the cascade of a parent
+                for obj in deleted:
+                    copy = self.__writer.get(type(obj), obj.id)
+                    if copy is not None and copy not in self.__writer.deleted:
+                        self.__writer.delete(copy)
+        for obj in changed + deleted:
+            if obj in session:
+                session.expunge(obj)
+        self.__behind.request(self.__commit, self.__batch_ms / 1000, wait)
+        # the saved objects stay in the session, as if loaded from the rows
+        # the writer commits, so that get still returns the same instances
+        for obj in changed:
+            make_transient(obj)
+            make_transient_to_detached(obj)
+            session.add(obj)
+
+    def __commit(self):
+        """commits the changes moved to the writer session"""
+        with self.__writing:
+            try:
+                self.__writer.commit()
+            except Exception:
+                self.__writer.rollback()
+                raise
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
@@ -67,40 +255,215 @@ class DBStorage:
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        versions.metadata.create_all(self.__engine)
+        try:
+            with self.__engine.begin() as connection:
+                known = set(connection.execute(
+                    sqlalchemy.select(versions.c.name)).scalars())
+                missing = [{"name": name, "count": 0} for name in classes
+                           if name not in known]
+                if missing:
+                    connection.execute(versions.insert(), missing)
+        except sqlalchemy.exc.IntegrityError:
+            # inserted by another process in the meantime
+            pass
+        # in batched mode the sessions never flush, save() moving their
+        # changes to the writer
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    autoflush=self.__batch_ms <= 0)
+        event.listen(sess_factory, "before_flush", self.__flushing)
+        event.listen(sess_factory, "before_commit", self.__committing)
+        event.listen(sess_factory, "after_commit", self.__ended)
+        event.listen(sess_factory, "after_rollback", self.__ended)
         Session = scoped_session(sess_factory)
         self.__session = Session
+        if self.__batch_ms > 0:
+            self.__writer = sess_factory(autoflush=True)
+
+    def __flushing(self, session, context, instances):
+        """
+        drops what cached() kept of the objects about to be flushed, which
+        the session no longer reads from the cache until the transaction
+        ends
+        """
+        flushed = session.info.setdefault("flushed", set())
+        for obj in list(session.dirty) + list(session.deleted):
+            key = obj.__class__.__name__ + '.' + str(obj.id)
+            self.__cache.pop(key, None)
+            flushed.add(key)
+        changed = session.info.setdefault("changed", set())
+        for obj in list(session.new) + list(session.dirty) + list(
+                session.deleted):
+            changed.add(obj.__class__.__name__)
+
+    @staticmethod
+    def __committing(session):
+        """
+        counts a change of the classes whose objects the transaction
+        changed, with one statement run last so that the rows of versions
+        stay locked only until the commit
+        """
+        session.flush()
+        names = session.info.pop("changed", set()) & set(classes)
+        if names:
+            session.execute(versions.update().where(
+                versions.c.name.in_(names)).values(
+                count=versions.c.count + 1))
+
+    @staticmethod
+    def __ended(session):
+        """
+        lets the session read the cache and the versions again once its
+        transaction ends
+        """
+        for name in ("flushed", "changed", "versions"):
+            session.info.pop(name, None)
+
+    def cached(self, obj, build):
+        """
+        returns build(obj), computed once for a persistent obj until an
+        object of its class changes, in whatever session it is loaded; the
+        objects changed by the session and not committed yet are built
+        every time
+        """
+        state = sqlalchemy.inspect(obj)
+        if not state.persistent or state.modified:
+            return build(obj)
+        key = obj.__class__.__name__ + '.' + obj.id
+        if key in state.session.info.get("flushed", ()):
+            return build(obj)
+        version = self.__versions(state.session, obj.__class__.__name__)
+        entry = self.__cache.get(key)
+        if entry is None or entry[0] != version[0]:
+            entry = self.__cache[key] = (version[0], {})
+        if build not in entry[1]:
+            entry[1][build] = build(obj)
+        return entry[1][build]
+
+    def version(self, cls=None):
+        """
+        returns a tag that changes with the objects of cls, or with any
+        object, read from the counts of versions since other processes
+        may write the tables; the time of the last change is None as
+        updated_at may not tell apart changes made within a second
+        """
+        if cls is None:
+            names = list(classes)
+        else:
+            names = [cls if type(cls) is str else cls.__name__]
+        return self.__versions(self.__session(), *names)
+
+    @staticmethod
+    def __versions(session, *names):
+        """
+        returns the version of the classes of names, read once per
+        transaction of session
+        """
+        known = session.info.setdefault("versions", {})
+        missing = [name for name in names if name not in known]
+        if missing:
+            known.update(session.execute(
+                sqlalchemy.select(versions.c.name, versions.c.count)
+                .where(versions.c.name.in_(missing))).all())
+        return ".".join(str(known.get(name, 0)) for name in names), None
+
+    def page(self, cls, limit=None, after=None, attr=None, value=None):
+        """
+        returns the objects of cls in the order of their ids, only those
+        whose id is greater than after if given and at most limit of them;
+        with attr, only those whose attr equals value
+        """
+        query = self.__session.query(cls)
+        if attr is not None:
+            query = query.filter(getattr(cls, attr) == value)
+        if after is not None:
+            query = query.filter(cls.id > after)
+        return query.order_by(cls.id).limit(limit).all()
+
+    def query(self, cls, ranges=None, order=None, reverse=False):
+        """
+        returns the objects of cls whose fields lie within the (min, max)
+        pairs of ranges, None meaning unbounded, sorted by the field order
+        if given
+        """
+        return self.__filter(self.__session.query(cls), cls, ranges, order,
+                             reverse).all()
+
+    def __filter(self, query, cls, ranges=None, order=None, reverse=False):
+        """adds the filters and ordering of query() to query"""
+        for field, (lo, hi) in (ranges or {}).items():
+            column = getattr(cls, field)
+            if lo is not None:
+                query = query.filter(column >= lo)
+            if hi is not None:
+                query = query.filter(column <= hi)
+        if order:
+            column = getattr(cls, order)
+            query = query.order_by(column.is_(None),
+                                   column.desc() if reverse else column)
+        return query
+
+    def search(self, states=None, cities=None, amenities=None, ranges=None,
+               order=None, reverse=False):
+        """
+        returns the places in the states or cities of the given ids, or in
+        any city if there are none, that have every amenity of amenities,
+        filtered and sorted as query() does; all in one statement, joining
+        the cities of the places and the place_amenity rows grouped by
+        place that count every amenity
+        """
+        query = self.__session.query(Place)
+        if states or cities:
+            query = query.join(City, Place.city_id == City.id).filter(
+                sqlalchemy.or_(City.state_id.in_(set(states or ())),
+                               City.id.in_(set(cities or ()))))
+        if amenities:
+            amenities = set(amenities)
+            place_amenity = Place.amenities.property.secondary
+            having = sqlalchemy.select(place_amenity.c.place_id).where(
+                place_amenity.c.amenity_id.in_(amenities)).group_by(
+                place_amenity.c.place_id).having(
+                sqlalchemy.func.count(sqlalchemy.distinct(
+                    place_amenity.c.amenity_id)) == len(amenities)).subquery()
+            query = query.join(having, having.c.place_id == Place.id)
+        return self.__filter(query, Place, ranges, order, reverse).all()
 
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
+    def get(self, cls, id, *eager):
         """
         Returns the object based on the class name and its ID, or
-        None if not found
+        None if not found, with the relationship paths of eager loaded
         """
-        if cls not in classes.values():
+        if cls not in classes.values() or id is None:
             return None
 
-        all_cls = models.storage.all(cls)
-        for value in all_cls.values():
-            if (value.id == id):
-                return value
+        if eager:
+            return self.__session.query(cls).options(
+                *self.options(cls, *eager)).filter(cls.id == id).first()
+        return self.__session.get(cls, id)
 
-        return None
+    def counts(self):
+        """
+        returns the number of objects of each class name, counted by one
+        query
+        """
+        names = list(classes)
+        row = self.__session.execute(sqlalchemy.select(*[
+            sqlalchemy.select(sqlalchemy.func.count())
+            .select_from(classes[name]).scalar_subquery()
+            for name in names])).one()
+        return dict(zip(names, row))
 
     def count(self, cls=None):
         """
         count the number of objects in storage
         """
-        all_class = classes.values()
-
         if not cls:
-            count = 0
-            for clas in all_class:
-                count += len(models.storage.all(clas).values())
-        else:
-            count = len(models.storage.all(cls).values())
+            return sum(self.counts().values())
 
-        return count
+        if type(cls) is str:
+            cls = classes[cls]
+        return self.__session.query(sqlalchemy.func.count(cls.id)).scalar()
@@ -3,6 +3,10 @@
 Contains the FileStorage class
 """
 
+from bisect import bisect_left, bisect_right
+import heapq
+from datetime import datetime
+from itertools import chain
 import json
 import models
 from models.amenity import Amenity
@@ -12,93 +16,654 @@ from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from models.engine import columns, serializers
+from models.engine.write_behind import WriteBehind
 from hashlib import md5
+import os
+from os import getenv
+import threading
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# foreign keys indexed for the relationship getters of each class; the
+# objects of a list of keys are indexed under each of them
+relations = {"City": ("state_id",),
+             "Place": ("city_id", "user_id", "amenity_ids"),
+             "Review": ("place_id", "user_id")}
+# numeric fields mirrored in columns for the queries of each class
+numeric = {"Place": ("number_rooms", "number_bathrooms", "max_guest",
+                     "price_by_night", "latitude", "longitude")}
+
+
+def _keys(value):
+    """
+    returns the keys an attribute value is indexed under: the ids it holds
+    or lists, the values that are not strings being left out of the index
+    """
+    if type(value) is list:
+        return [item for item in value if type(item) is str]
+    if type(value) is str:
+        return (value,)
+    return ()
+
+
+def _fsync(path):
+    """flushes the file or directory at path to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
+    # string - format of the snapshot written by save: json, binary or
+    # mapped, which reload serves in place from a shared memory map
+    __format = getenv("HBNB_FS_FORMAT", "json")
     # string - path to the JSON file
-    __file_path = "file.json"
+    __file_path = {"binary": "file.bin",
+                   "mapped": "file.map"}.get(__format, "file.json")
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by <class name>
+    __classes = {}
+    # dictionary - objects by (<class name>, <foreign key>) and key value
+    __relations = {}
+    # dictionary - records read but not built yet in lazy mode, by <class
+    # name> then <class name>.id; a record is a dict or its JSON bytes
+    __raw = {}
+    # bool - build the objects read from the JSON file on first access
+    __lazy = getenv("HBNB_FS_LAZY") == "1"
+    # bool - mirror the numeric fields of each class in columns for query()
+    __columnar = getenv("HBNB_FS_COLUMNS") == "1"
+    # dictionary - Columns by <class name>, built by the first query()
+    __columns = {}
+    # dictionary - sorted list of the keys of each class, built by the first
+    # page(); keys deleted since are dropped when page() meets them
+    __sorted = {}
+    # dictionary - (object, {build: value}) by key, the values computed
+    # from stored objects by cached(), dropped when the object changes
+    __cache = {}
+    # dictionary - (number of changes, time of the last one) by <class
+    # name>, counted from __started, for version()
+    __versions = {}
+    __started = datetime.utcnow()
+    # string - sets apart the versions of this process from any other's
+    __epoch = os.urandom(4).hex()
+    # tuple - (inode, mtime, size) of the snapshot and its journals at the
+    # last reload, which counts a change of every class when they differ
+    __loaded = None
+    # dictionary - (inode, mtime, size) of the mapped snapshot in __raw
+    __mapped = {}
+    # dictionary - keys changed since the last save, mapped to the set of
+    # changed attribute names or to None when the whole record is written
+    __dirty = {}
+    # bool - append changes to <__file_path>.log instead of rewriting it
+    __journal = getenv("HBNB_FS_JOURNAL") == "1"
+    # int - journal size in bytes that triggers a background compaction
+    __journal_max = int(getenv("HBNB_FS_JOURNAL_MAX", 1 << 20))
+    # string - none: leave flushing to the OS, always: fsync every write,
+    # group: fsync everything written in the last __durability_ms at once
+    __durability = getenv("HBNB_FS_SYNC", "none")
+    __durability_ms = int(getenv("HBNB_FS_SYNC_MS", 100))
+    # set - paths written but not yet fsynced in group mode
+    __unsynced = set()
+    # int - milliseconds a save may wait to be coalesced with later saves,
+    # 0 writes on every save
+    __behind_ms = int(getenv("HBNB_FS_WRITE_BEHIND_MS", 0))
+    __behind = WriteBehind()
+    __lock = threading.RLock()
+    __compacting = threading.Lock()
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def all(self, cls=None, *eager):
+        """
+        returns the dictionary __objects, or a copy of the partition of
+        cls, as large as the class only; eager is accepted for DBStorage,
+        relationships being indexed here
+        """
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            if type(cls) is not str:
+                cls = cls.__name__
+            if self.__raw.get(cls):
+                self.__hydrate(cls)
+            return dict(self.__classes.get(cls, {}))
+        for name in list(self.__raw):
+            if self.__raw[name]:
+                self.__hydrate(name)
         return self.__objects
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
-            key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
-
-    def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            if key == "password":
-                json_objects[key].decode()
-            json_objects[key] = self.__objects[key].to_dict(save_fs=1)
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+            name = obj.__class__.__name__
+            key = name + "." + obj.id
+            if self.__objects.get(key) is obj:
+                return
+            with self.__lock:
+                self.__raw.get(name, {}).pop(key, None)
+                self.__store(key, obj)
+                self.__dirty[key] = None
+                self.__touch(name)
+
+    def __store(self, key, obj):
+        """puts obj in __objects and the indexes in place of any other"""
+        if key in self.__objects:
+            self.__unindex(key, self.__objects[key])
+        self.__cache.pop(key, None)
+        self.__objects[key] = obj
+        self.__classes.setdefault(obj.__class__.__name__, {})[key] = obj
+        self.__index(key, obj)
+        self.__insort(key)
+
+    def __remove(self, key):
+        """takes the object of key out of __objects and the indexes"""
+        obj = self.__objects.pop(key)
+        self.__cache.pop(key, None)
+        self.__classes.get(obj.__class__.__name__, {}).pop(key, None)
+        self.__unindex(key, obj)
+
+    def __build(self, key, record):
+        """builds the object of a stored record and stores it"""
+        if type(record) is bytes:
+            record = json.loads(record)
+        self.__store(key, classes[record["__class__"]].from_dict(record))
+
+    def __defer(self, key, record):
+        """keeps a stored record to be built when it is first accessed"""
+        if key in self.__objects:
+            self.__remove(key)
+        self.__raw.setdefault(key.partition(".")[0], {})[key] = record
+        self.__insort(key)
+
+    def __insort(self, key):
+        """adds key to the sorted keys of its class, if they are kept"""
+        keys = self.__sorted.get(key.partition(".")[0])
+        if keys is not None:
+            i = bisect_left(keys, key)
+            if i == len(keys) or keys[i] != key:
+                keys.insert(i, key)
+
+    def __hydrate(self, name, key=None):
+        """builds the deferred records of class name, or only that of key"""
+        with self.__lock:
+            raw = self.__raw.get(name, {})
+            for k in (list(raw) if key is None else [key]):
+                if k in raw:
+                    self.__build(k, raw.pop(k))
+
+    def save(self, wait=False):
+        """
+        serializes __objects to the JSON file (path: __file_path), or in
+        write-behind mode schedules one write for all the saves made in
+        the next HBNB_FS_WRITE_BEHIND_MS; wait=True blocks until it is done
+        """
+        if self.__behind_ms > 0:
+            self.__behind.request(self.flush, self.__behind_ms / 1000, wait)
+        else:
+            self.flush()
+
+    def flush(self):
+        """writes the changes made so far to disk right away"""
+        if self.__journal:
+            self.__append()
+            return
+        with self.__lock:
+            self.__write(self.__file_path, self.__entries())
+            self.__dirty.clear()
+            for path in (self.__file_path + ".log",
+                         self.__file_path + ".log.old"):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.__written()
+
+    def __written(self, synced=True):
+        """
+        records the files just written as the last ones reloaded when they
+        hold the objects in memory, for reload() to leave these as they
+        are; in lazy and mapped modes reload() still trades them for their
+        records
+        """
+        if synced and not self.__lazy and self.__format != "mapped":
+            FileStorage.__loaded = self.__signature()
+
+    def __entries(self):
+        """yields the (key, record) pair of each object, built or not"""
+        for key, obj in self.__objects.items():
+            yield key, obj.to_dict(save_fs=1)
+        for raw in self.__raw.values():
+            yield from raw.items()
+
+    def __write(self, path, entries):
+        """replaces path atomically with a snapshot of entries"""
+        with open(path + ".tmp", 'wb') as f:
+            serializers.formats[self.__format].dump(entries, f)
+            if self.__durability == "always":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        self.__durable(path)
+
+    def __durable(self, path):
+        """makes the last write to path durable according to the policy"""
+        if self.__durability == "always":
+            _fsync(os.path.dirname(os.path.abspath(path)))
+        elif self.__durability == "group":
+            with self.__lock:
+                first = not self.__unsynced
+                self.__unsynced.add(path)
+            if first:
+                timer = threading.Timer(self.__durability_ms / 1000,
+                                        self.sync)
+                timer.daemon = True
+                timer.start()
+
+    def sync(self):
+        """fsyncs every file written since the last group commit"""
+        with self.__lock:
+            paths = list(self.__unsynced)
+            self.__unsynced.clear()
+        for path in paths:
+            if os.path.exists(path):
+                _fsync(path)
+        for folder in {os.path.dirname(os.path.abspath(p)) for p in paths}:
+            _fsync(folder)
+
+    def __append(self):
+        """appends the objects changed since the last save to the journal"""
+        with self.__lock:
+            if not self.__dirty:
+                return
+            lines = []
+            for key, attrs in self.__dirty.items():
+                obj = self.__objects.get(key)
+                value = obj.to_dict(save_fs=1) if obj is not None else None
+                if value is not None and attrs is not None:
+                    attrs = attrs | {"__class__", "id"}
+                    value = {k: v for k, v in value.items() if k in attrs}
+                lines.append(json.dumps({key: value}) + "\n")
+            synced = self.__signature() == self.__loaded
+            with open(self.__file_path + ".log", 'a') as f:
+                f.write("".join(lines))
+                size = f.tell()
+                if self.__durability == "always":
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.__dirty.clear()
+            self.__written(synced)
+            self.__durable(self.__file_path + ".log")
+        if size > self.__journal_max and self.__compacting.acquire(False):
+            threading.Thread(target=self.__compact, daemon=True).start()
+
+    def compact(self):
+        """folds the journal into a new snapshot of __objects"""
+        if self.__compacting.acquire(False):
+            self.__compact()
+
+    def __compact(self):
+        """compacts while holding __compacting, which it releases"""
+        try:
+            log = self.__file_path + ".log"
+            with self.__lock:
+                entries = list(self.__entries())
+                if os.path.exists(log + ".old") and os.path.exists(log):
+                    with open(log, 'r') as src, open(log + ".old", 'a') as f:
+                        f.write(src.read())
+                    os.remove(log)
+                elif os.path.exists(log):
+                    os.replace(log, log + ".old")
+            self.__write(self.__file_path, entries)
+            if os.path.exists(log + ".old"):
+                os.remove(log + ".old")
+        finally:
+            self.__compacting.release()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """
+        deserializes the JSON file and its journal to __objects, unless
+        they did not change since the last reload and no object changed
+        since, or write-behind saves are still to be written: the objects
+        in memory are then newer than the file
+        """
+        with self.__lock:
+            if self.__behind.pending():
+                return
+            loaded = self.__signature()
+            if loaded == self.__loaded and not self.__dirty:
+                # the objects in memory are those of the files, which
+                # rebuilding would only take from cached()
+                return
+            # rebuilt at once by the next query() rather than row by row
+            self.__columns.clear()
+            self.__touch()
+            FileStorage.__loaded = loaded
+            try:
+                with open(self.__file_path, 'rb') as f:
+                    if serializers.mapped(f):
+                        self.__map(f)
+                        records = ()
+                    else:
+                        records = serializers.load(f)
+                    for key, record in records:
+                        if self.__lazy:
+                            self.__defer(key, record)
+                        else:
+                            self.__build(key, record)
+            except FileNotFoundError:
+                pass
+            self.__replay(self.__file_path + ".log.old")
+            self.__replay(self.__file_path + ".log")
+            self.__dirty.clear()
+
+    def __signature(self):
+        """returns the (inode, mtime, size) of the snapshot and journals"""
+        stamps = []
+        for path in (self.__file_path, self.__file_path + ".log",
+                     self.__file_path + ".log.old"):
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def __map(self, f):
+        """serves a mapped snapshot in place, unless it is already mapped"""
+        stat = os.fstat(f.fileno())
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self.__mapped.get(f.name) == version:
+            return
+        self.__mapped.clear()
+        self.__mapped[f.name] = version
+        for name in list(self.__raw):
+            if isinstance(self.__raw[name], serializers.MappedTable):
+                del self.__raw[name]
+                self.__sorted.pop(name, None)
+        for name, table in serializers.MappedSnapshot(f).tables().items():
+            self.__sorted.pop(name, None)
+            for key in [k for k in self.__classes.get(name, {}) if k in table]:
+                self.__remove(key)
+            self.__raw[name] = table
+
+    def __replay(self, path):
+        """applies the records of a journal file to __objects"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # torn tail of an append interrupted by a crash
+                        break
+                    for key, value in record.items():
+                        self.__apply(key, value)
+        except FileNotFoundError:
             pass
 
+    def __apply(self, key, value):
+        """applies a journal record, None meaning the key was deleted"""
+        raw = self.__raw.get(key.partition(".")[0], {})
+        if value is None:
+            raw.pop(key, None)
+            if key in self.__objects:
+                self.__remove(key)
+            return
+        # records of changed objects hold only the attributes that changed
+        if key in raw:
+            record = raw[key]
+            if type(record) is bytes:
+                record = json.loads(record)
+            record.update(value)
+            raw[key] = record
+            return
+        if key in self.__objects:
+            record = self.__objects[key].to_dict(save_fs=1)
+            record.update(value)
+            value = record
+        if self.__lazy:
+            self.__defer(key, value)
+        else:
+            self.__build(key, value)
+
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
-            key = obj.__class__.__name__ + '.' + obj.id
+            name = obj.__class__.__name__
+            key = name + '.' + obj.id
+            with self.__lock:
+                removed = self.__raw.get(name, {}).pop(key, None) is not None
+                if key in self.__objects:
+                    self.__remove(key)
+                    removed = True
+                if removed:
+                    self.__dirty[key] = None
+                    self.__touch(name)
+
+    def __index(self, key, obj):
+        """adds obj to the buckets of its foreign keys"""
+        name = obj.__class__.__name__
+        for attr in relations.get(name, ()):
+            index = self.__relations.setdefault((name, attr), {})
+            for value in _keys(getattr(obj, attr, None)):
+                index.setdefault(value, {})[key] = obj
+        if name in self.__columns:
+            self.__columns[name].put(key, obj)
+
+    def __unindex(self, key, obj):
+        """removes obj from the buckets of its foreign keys"""
+        name = obj.__class__.__name__
+        for attr in relations.get(name, ()):
+            index = self.__relations.get((name, attr), {})
+            for value in _keys(getattr(obj, attr, None)):
+                bucket = index.get(value, {})
+                bucket.pop(key, None)
+                if not bucket:
+                    index.pop(value, None)
+        if name in self.__columns:
+            self.__columns[name].remove(key)
+
+    def changed(self, obj, attr, old):
+        """marks a stored obj dirty and reindexes it after obj.attr changed"""
+        name = obj.__class__.__name__
+        key = name + "." + str(getattr(obj, "id", None))
+        if self.__objects.get(key) is not obj:
+            return
+        with self.__lock:
+            self.__cache.pop(key, None)
+            self.__touch(name)
+            if key not in self.__dirty:
+                self.__dirty[key] = {attr}
+            elif self.__dirty[key] is not None:
+                self.__dirty[key].add(attr)
+            if name in self.__columns:
+                self.__columns[name].update(key, attr, getattr(obj, attr))
+            if attr not in relations.get(name, ()):
+                return
+            index = self.__relations.setdefault((name, attr), {})
+            for value in _keys(old):
+                bucket = index.get(value, {})
+                bucket.pop(key, None)
+                if not bucket:
+                    index.pop(value, None)
+            for value in _keys(getattr(obj, attr)):
+                index.setdefault(value, {})[key] = obj
+
+    def __touch(self, name=None):
+        """counts a change of the objects of name, or of every class"""
+        now = datetime.utcnow()
+        for name in classes if name is None else (name,):
+            count = self.__versions.get(name, (0, None))[0]
+            self.__versions[name] = (count + 1, now)
+
+    def version(self, cls=None):
+        """
+        returns a tag that changes with the objects of cls, or with any
+        object, and the time of their last change
+        """
+        if cls is None:
+            names = classes
+        else:
+            names = (cls if type(cls) is str else cls.__name__,)
+        versions = [self.__versions.get(name, (0, self.__started))
+                    for name in names]
+        return ("{}.{}".format(self.__epoch, sum(c for c, _ in versions)),
+                max(t for _, t in versions))
+
+    def cached(self, obj, build):
+        """
+        returns build(obj), computed once for a stored obj until one of its
+        attributes is set or it is replaced or deleted
+        """
+        key = obj.__class__.__name__ + "." + str(getattr(obj, "id", None))
+        entry = self.__cache.get(key)
+        if entry is None or entry[0] is not obj:
+            if self.__objects.get(key) is not obj:
+                return build(obj)
+            entry = self.__cache[key] = (obj, {})
+        if build not in entry[1]:
+            entry[1][build] = build(obj)
+        return entry[1][build]
+
+    def related(self, cls, attr, value):
+        """
+        returns a dictionary of the objects of cls whose attr equals or
+        lists value, copied from the index of attr if there is one
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        if self.__raw.get(cls):
+            self.__hydrate(cls)
+        if attr in relations.get(cls, ()):
+            with self.__lock:
+                return dict(self.__relations.get((cls, attr), {})
+                            .get(value, {}))
+        return {key: obj for key, obj in self.all(cls).items()
+                if getattr(obj, attr, None) == value}
+
+    def page(self, cls, limit=None, after=None, attr=None, value=None):
+        """
+        returns the objects of cls in the order of their ids, only those
+        whose id is greater than after if given and at most limit of them;
+        with attr, only those whose attr equals or lists value
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        if attr is not None:
+            bucket = self.related(cls, attr, value)
+            keys = bucket
+            if after is not None:
+                keys = [key for key in bucket if key > cls + "." + after]
+            if limit is None:
+                return [bucket[key] for key in sorted(keys)]
+            return [bucket[key] for key in heapq.nsmallest(limit, keys)]
+        with self.__lock:
+            if cls not in self.__sorted:
+                self.__sorted[cls] = sorted(chain(
+                    self.__classes.get(cls, {}), self.__raw.get(cls, {})))
+        keys = self.__sorted[cls]
+        i = 0 if after is None else bisect_right(keys, cls + "." + after)
+        objs = []
+        while i < len(keys) and (limit is None or len(objs) < limit):
+            key = keys[i]
+            if key in self.__raw.get(cls, ()):
+                self.__hydrate(cls, key)
             if key in self.__objects:
-                del self.__objects[key]
+                objs.append(self.__objects[key])
+                i += 1
+            else:
+                with self.__lock:
+                    if i < len(keys) and keys[i] == key:
+                        del keys[i]
+        return objs
+
+    def query(self, cls, ranges=None, order=None, reverse=False):
+        """
+        returns the objects of cls whose fields lie within the (min, max)
+        pairs of ranges, None meaning unbounded, sorted by the field order
+        if given; numeric fields are read from their columns
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        ranges = ranges or {}
+        objects = self.all(cls)
+        fields = set(ranges) | ({order} if order else set())
+        if self.__columnar and fields <= set(numeric.get(cls, ())):
+            with self.__lock:
+                if cls not in self.__columns:
+                    table = columns.Columns(numeric[cls])
+                    table.extend(objects.items())
+                    self.__columns[cls] = table
+                keys = self.__columns[cls].query(ranges, order, reverse)
+            return [objects[key] for key in keys]
+        return self.__select(list(objects.values()), ranges, order, reverse)
+
+    def __select(self, objs, ranges, order=None, reverse=False):
+        """filters and sorts the list objs as query() does, by scanning"""
+        fields = set(ranges) | ({order} if order else set())
+        values = {field: [columns.number(getattr(obj, field, None))
+                          for obj in objs] for field in fields}
+        rows = columns.select(values, ranges, order, reverse)
+        return objs if rows is None else [objs[i] for i in rows]
+
+    def search(self, states=None, cities=None, amenities=None, ranges=None,
+               order=None, reverse=False):
+        """
+        returns the places in the states or cities of the given ids, or in
+        any city if there are none, that have every amenity of amenities,
+        filtered and sorted as query() does; the places of each state, city
+        and amenity are read from the indexes and intersected from the
+        smallest set, so the cost follows the size of the result
+        """
+        if not states and not cities and not amenities:
+            return self.query(Place, ranges, order, reverse)
+        sets = []
+        if states or cities:
+            city_ids = list(cities or ())
+            for state_id in states or ():
+                city_ids += [city.id for city in
+                             self.related(City, "state_id", state_id).values()]
+            places = {}
+            for city_id in city_ids:
+                places.update(self.related(Place, "city_id", city_id))
+            sets.append(places)
+        for amenity_id in set(amenities or ()):
+            sets.append(self.related(Place, "amenity_ids", amenity_id))
+        sets.sort(key=len)
+        places = list(sets[0].values())
+        if len(sets) > 1:
+            places = [obj for key, obj in sets[0].items()
+                      if all(key in places for places in sets[1:])]
+        return self.__select(places, ranges or {}, order, reverse)
 
     def close(self):
         """call reload() method for deserializing the JSON file to objects"""
         self.reload()
 
-    def get(self, cls, id):
+    def get(self, cls, id, *eager):
         """
         Returns the object based on the class name and its ID, or
-        None if not found
+        None if not found; eager is accepted for DBStorage
         """
         if cls not in classes.values():
             return None
 
-        all_cls = models.storage.all(cls)
-        for value in all_cls.values():
-            if (value.id == id):
-                return value
+        key = cls.__name__ + "." + str(id)
+        if key in self.__raw.get(cls.__name__, ()):
+            self.__hydrate(cls.__name__, key)
+        return self.__objects.get(key)
 
-        return None
+    def counts(self):
+        """returns the number of objects of each class name"""
+        return {name: self.count(name) for name in classes}
 
     def count(self, cls=None):
         """
         count the number of objects in storage
         """
-        all_class = classes.values()
-
         if not cls:
-            count = 0
-            for clas in all_class:
-                count += len(models.storage.all(clas).values())
-        else:
-            count = len(models.storage.all(cls).values())
+            return len(self.__objects) + sum(map(len, self.__raw.values()))
 
-        return count
+        if type(cls) is not str:
+            cls = cls.__name__
+        return len(self.__classes.get(cls, {})) + len(self.__raw.get(cls, {}))
@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+"""
+Contains the on-disk formats of the FileStorage snapshot
+"""
+
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+import io
+import json
+import mmap
+import pickle
+import struct
+import sys
+
+# magic numbers opening a snapshot in the binary and mapped formats
+MAGIC = b"HBNB\x01"
+MAPPED = b"HBNB\x02"
+# index entry of the mapped format: key offset and length, record offset
+# and length
+ENTRY = struct.Struct(">QIQI")
+# timestamps stored as microseconds since EPOCH by the binary format
+EPOCH = datetime(1970, 1, 1)
+TIMESTAMPS = ("created_at", "updated_at")
+# rows per frame of the binary format
+CHUNK = 4096
+
+
+def _isoformat(value):
+    """JSON encoder fallback for the datetimes of a record"""
+    if type(value) is datetime:
+        return value.isoformat(timespec="microseconds")
+    raise TypeError("{} is not JSON serializable".format(type(value)))
+
+
+def _micros(value):
+    """converts a datetime or its ISO string to microseconds since EPOCH"""
+    if type(value) is str:
+        value = datetime.fromisoformat(value)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+class _Unpickler(pickle.Unpickler):
+    """unpickler that only rebuilds builtin values, never globals"""
+
+    def find_class(self, module, name):
+        """refuses every global referenced by the stream"""
+        raise pickle.UnpicklingError("{}.{} is not allowed in a snapshot"
+                                     .format(module, name))
+
+
+class JSONFormat:
+    """JSON object with one "<key>": {<record>} entry per line"""
+
+    def dump(self, entries, f):
+        """writes the (key, record) pairs of entries to the binary file f"""
+        f.write(b"{")
+        separator = b"\n"
+        for key, record in entries:
+            if type(record) is not bytes:
+                record = json.dumps(record, default=_isoformat).encode()
+            f.write(separator + json.dumps(key).encode() + b": " + record)
+            separator = b",\n"
+        f.write(b"\n}\n")
+
+    def load(self, f):
+        """
+        yields the (key, record) pairs of the binary file f one at a time;
+        records of the line-per-object layout are left as JSON bytes
+        """
+        if f.readline().strip() != b"{":
+            # single-line file written by json.dump
+            f.seek(0)
+            yield from json.load(f).items()
+            return
+        for line in f:
+            line = line.rstrip().rstrip(b",")
+            if line == b"}":
+                break
+            if line:
+                key, _, record = line.partition(b": ")
+                yield json.loads(key), record
+
+
+class BinaryFormat:
+    """
+    MAGIC followed by frames of a 4-byte length and a pickled
+    (class name, fields, rows) table; the records of a table share the
+    same class and fields and store their timestamps as integers
+    """
+
+    def dump(self, entries, f):
+        """writes the (key, record) pairs of entries to the binary file f"""
+        tables = {}
+        for key, record in entries:
+            if type(record) is bytes:
+                record = json.loads(record)
+            fields = tuple(sorted(record))
+            tables.setdefault((record["__class__"], fields),
+                              []).append(record)
+        f.write(MAGIC)
+        for (name, fields), records in tables.items():
+            columns = tuple(field for field in fields if field != "__class__")
+            for start in range(0, len(records), CHUNK):
+                rows = []
+                for record in records[start:start + CHUNK]:
+                    row = [record[field] for field in columns]
+                    for i, field in enumerate(columns):
+                        if field in TIMESTAMPS:
+                            row[i] = _micros(row[i])
+                    rows.append(row)
+                frame = pickle.dumps((name, columns, rows),
+                                     pickle.HIGHEST_PROTOCOL)
+                f.write(struct.pack(">I", len(frame)) + frame)
+
+    def load(self, f):
+        """yields the (key, record) pairs of the binary file f one at a time"""
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a binary snapshot")
+        while True:
+            size = f.read(4)
+            if not size:
+                return
+            frame = f.read(struct.unpack(">I", size)[0])
+            name, columns, rows = _Unpickler(io.BytesIO(frame)).load()
+            stamps = [i for i, field in enumerate(columns)
+                      if field in TIMESTAMPS]
+            for row in rows:
+                for i in stamps:
+                    row[i] = EPOCH + timedelta(microseconds=row[i])
+                record = dict(zip(columns, row))
+                record["__class__"] = name
+                yield name + "." + record["id"], record
+
+
+class MappedFormat:
+    """
+    MAPPED, the number of records, their index sorted by key, then the
+    keys and the JSON records; read in place through a memory map so that
+    processes serving the same file share it in the page cache
+    """
+
+    def dump(self, entries, f):
+        """writes the (key, record) pairs of entries to the binary file f"""
+        encoded = []
+        for key, record in entries:
+            if type(record) is not bytes:
+                record = json.dumps(record, default=_isoformat).encode()
+            encoded.append((key.encode(), record))
+        encoded.sort()
+        offset = len(MAPPED) + 8 + ENTRY.size * len(encoded)
+        index = []
+        for key, record in encoded:
+            index.append(ENTRY.pack(offset, len(key),
+                                    offset + len(key), len(record)))
+            offset += len(key) + len(record)
+        f.write(MAPPED + struct.pack(">Q", len(encoded)))
+        f.write(b"".join(index))
+        for key, record in encoded:
+            f.write(key + record)
+
+    def load(self, f):
+        """yields the (key, record) pairs of the binary file f one at a time"""
+        snapshot = MappedSnapshot(f)
+        for i in range(snapshot.count):
+            yield snapshot.key(i).decode(), snapshot.record(i)
+
+
+class MappedSnapshot:
+    """read-only memory map of a snapshot in the mapped format"""
+
+    def __init__(self, f):
+        """maps the binary file f, or reads it if it has no descriptor"""
+        try:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except io.UnsupportedOperation:
+            self.map = f.read()
+        if self.map[:len(MAPPED)] != MAPPED:
+            raise ValueError("not a mapped snapshot")
+        self.count = struct.unpack_from(">Q", self.map, len(MAPPED))[0]
+
+    def entry(self, i):
+        """returns the i-th index entry"""
+        return ENTRY.unpack_from(self.map, len(MAPPED) + 8 + ENTRY.size * i)
+
+    def key(self, i):
+        """returns the i-th key, as bytes"""
+        offset, size, _, _ = self.entry(i)
+        return self.map[offset:offset + size]
+
+    def record(self, i):
+        """returns the i-th record, as JSON bytes"""
+        _, _, offset, size = self.entry(i)
+        return self.map[offset:offset + size]
+
+    def bisect(self, key, lo=0, hi=None):
+        """returns the position of the first key not lower than key"""
+        hi = self.count if hi is None else hi
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, key, lo=0, hi=None):
+        """returns the position of key, or -1"""
+        hi = self.count if hi is None else hi
+        i = self.bisect(key, lo, hi)
+        return i if i < hi and self.key(i) == key else -1
+
+    def tables(self):
+        """returns a MappedTable per class name, found by binary search"""
+        tables = {}
+        lo = 0
+        while lo < self.count:
+            name = self.key(lo).partition(b".")[0]
+            hi = self.bisect(name + b"/", lo)
+            tables[name.decode()] = MappedTable(self, lo, hi)
+            lo = hi
+        return tables
+
+
+class MappedTable(MutableMapping):
+    """
+    the records of one class in a MappedSnapshot, decoded on access;
+    changes are kept in memory and hide the mapped records they replace
+    """
+
+    def __init__(self, snapshot, lo, hi):
+        """wraps the records between positions lo and hi of snapshot"""
+        self.snapshot = snapshot
+        self.lo = lo
+        self.hi = hi
+        self.overlay = {}
+        self.hidden = set()
+
+    def __find(self, key):
+        """returns the position of a visible mapped key, or -1"""
+        if key in self.hidden:
+            return -1
+        return self.snapshot.find(key.encode(), self.lo, self.hi)
+
+    def __contains__(self, key):
+        """tells whether key has a record"""
+        return key in self.overlay or self.__find(key) >= 0
+
+    def __getitem__(self, key):
+        """returns the record of key"""
+        if key in self.overlay:
+            return self.overlay[key]
+        i = self.__find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self.snapshot.record(i)
+
+    def __setitem__(self, key, record):
+        """replaces the record of key"""
+        if self.__find(key) >= 0:
+            self.hidden.add(key)
+        self.overlay[key] = record
+
+    def __delitem__(self, key):
+        """removes the record of key"""
+        if key in self.overlay:
+            del self.overlay[key]
+        elif self.__find(key) >= 0:
+            self.hidden.add(key)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        """yields the keys with a record"""
+        for i in range(self.lo, self.hi):
+            key = self.snapshot.key(i).decode()
+            if key not in self.hidden:
+                yield key
+        yield from list(self.overlay)
+
+    def __len__(self):
+        """returns the number of records, without decoding any"""
+        return self.hi - self.lo - len(self.hidden) + len(self.overlay)
+
+
+formats = {"json": JSONFormat(), "binary": BinaryFormat(),
+           "mapped": MappedFormat()}
+
+
+def load(f):
+    """yields the records of the binary file f, whatever its format"""
+    magic = f.read(len(MAGIC))
+    f.seek(0)
+    if magic == MAGIC:
+        return formats["binary"].load(f)
+    if magic == MAPPED:
+        return formats["mapped"].load(f)
+    return formats["json"].load(f)
+
+
+def mapped(f):
+    """tells whether the binary file f is a snapshot in the mapped format"""
+    magic = f.read(len(MAPPED))
+    f.seek(0)
+    return magic == MAPPED
+
+
+def convert(source, destination, format):
+    """rewrites the snapshot at source in format at destination"""
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        formats[format].dump(load(src), dst)
+
+
+if __name__ == "__main__":
+    """ converts a snapshot: serializers.py <source> <destination> <format>"""
+    if len(sys.argv) != 4 or sys.argv[3] not in formats:
+        print("Usage: {} <source> <destination> json|binary|mapped"
+              .format(sys.argv[0]))
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2], sys.argv[3])
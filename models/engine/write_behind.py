@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+Contains the WriteBehind class, which coalesces the flushes of the storage
+engines
+"""
+
+import atexit
+import threading
+
+
+class WriteBehind:
+    """coalesces the flushes requested within a window into a single one"""
+
+    def __init__(self):
+        """initializes an idle write-behind queue"""
+        self.cond = threading.Condition()
+        self.flushing = threading.Lock()
+        self.requested = 0
+        self.done = 0
+        # last request covered by a failed flush, and the error it raised
+        self.failed = 0
+        self.error = None
+        self.flush = None
+        self.window = 0
+        self.timer = None
+        atexit.register(self.drain)
+
+    def pending(self):
+        """returns whether some requests are not flushed yet"""
+        return self.requested > self.done
+
+    def request(self, flush, window, wait=False):
+        """
+        schedules flush in window seconds, optionally waiting for it; the
+        callers waiting for a flush that fails get its error
+        """
+        with self.cond:
+            self.requested += 1
+            ticket = self.requested
+            self.flush = flush
+            self.window = window
+            self.schedule()
+            while wait and self.done < ticket:
+                if self.failed >= ticket:
+                    raise self.error
+                self.cond.wait()
+
+    def run(self):
+        """
+        runs one flush covering every request made so far; the requests
+        stay pending if it fails, and the flush is retried after a window
+        """
+        with self.flushing:
+            with self.cond:
+                self.timer = None
+                ticket = self.requested
+                flush = self.flush
+            if ticket <= self.done:
+                return
+            try:
+                flush()
+            except Exception as error:
+                with self.cond:
+                    self.failed = ticket
+                    self.error = error
+                    self.cond.notify_all()
+                    self.schedule()
+                raise
+            with self.cond:
+                self.done = max(self.done, ticket)
+                self.cond.notify_all()
+
+    def schedule(self):
+        """starts the timer of the next flush, unless it is started already"""
+        if self.timer is None:
+            self.timer = threading.Timer(self.window, self.run)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def drain(self):
+        """flushes the pending requests right away, e.g. at exit"""
+        if self.pending():
+            self.run()
@@ -30,6 +30,21 @@ class User(BaseModel, Base):
         """initializes user"""
         super().__init__(*args, **kwargs)
 
+    if models.storage_t != 'db':
+        @property
+        def places(self):
+            """getter attribute returns the list of Place instances"""
+            from models.place import Place
+            return list(models.storage.related(Place, "user_id",
+                                               self.id).values())
+
+        @property
+        def reviews(self):
+            """getter attribute returns the list of Review instances"""
+            from models.review import Review
+            return list(models.storage.related(Review, "user_id",
+                                               self.id).values())
+
     def __setattr__(self, name, value):
         """sets a password with md5 encryption"""
         if name == "password":
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditionalDocs and TestConditional classes
+"""
+
+from api.v1.app import app
+from api.v1.views import conditional
+from datetime import datetime
+import inspect
+import models
+from models.state import State
+import pep8
+import time
+import unittest
+
+
+class TestConditionalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of conditional"""
+    def test_pep8_conformance_conditional(self):
+        """Test that api/v1/views/conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_conditional(self):
+        """Test that tests/test_api/test_conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_conditional_func_docstrings(self):
+        """Test for the presence of docstrings in conditional functions"""
+        for name, func in inspect.getmembers(conditional, inspect.isfunction):
+            if func.__module__ == conditional.__name__:
+                with self.subTest(name=name):
+                    self.assertTrue(len(func.__doc__) >= 1)
+
+
+class TestConditional(unittest.TestCase):
+    """Test the conditional GETs of the API"""
+    def setUp(self):
+        """Stores a state changed long ago"""
+        self.client = app.test_client()
+        state = State(name="Jalisco")
+        state.updated_at = datetime(2020, 1, 1)
+        models.storage.new(state)
+        models.storage.save()
+        self.id = state.id
+        self.url = "/api/v1/states/" + state.id
+        models.storage.close()
+
+    def tearDown(self):
+        """Deletes the states stored by the test"""
+        for state in list(models.storage.all(State).values()):
+            if state.id == self.id or state.name == "Colima":
+                models.storage.delete(state)
+        models.storage.save()
+        models.storage.close()
+
+    def test_instance_etag(self):
+        """Test that If-None-Match answers 304 until the object changes"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        # a change that keeps updated_at, as two changes within a second
+        # do once the database drops the fraction of a second
+        state = models.storage.get(State, self.id)
+        state.name = "Nayarit"
+        models.storage.save()
+        models.storage.close()
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["name"], "Nayarit")
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_instance_modified_since(self):
+        """Test that If-Modified-Since answers 304 until the object
+        changes, and that a change of the last second sends no date"""
+        response = self.client.get(self.url)
+        modified = response.headers["Last-Modified"]
+        self.assertEqual(modified, "Wed, 01 Jan 2020 00:00:00 GMT")
+        response = self.client.get(
+            self.url, headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.put(self.url, json={"name": "Nayarit"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            self.url, headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["name"], "Nayarit")
+        self.assertNotIn("Last-Modified", response.headers)
+
+    def test_collection_etag(self):
+        """Test that If-None-Match answers 304 until the list changes"""
+        response = self.client.get("/api/v1/states")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        response = self.client.get("/api/v1/states",
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get("/api/v1/states?limit=1",
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post("/api/v1/states", json={"name": "Colima"})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get("/api/v1/states",
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Colima", [state.get("name")
+                                 for state in response.get_json()])
+
+    @unittest.skipIf(models.storage_t == 'db',
+                     "lists have no Last-Modified in db storage")
+    def test_collection_modified_since(self):
+        """Test that If-Modified-Since answers 304 until the list changes"""
+        time.sleep(1.1)
+        response = self.client.get("/api/v1/states")
+        modified = response.headers["Last-Modified"]
+        response = self.client.get(
+            "/api/v1/states", headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.post("/api/v1/states", json={"name": "Colima"})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(
+            "/api/v1/states", headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 200)
@@ -138,6 +138,45 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_from_dict(self):
+        """Test that from_dict rebuilds the instance to_dict described"""
+        bm = BaseModel()
+        bm.name = "Holberton"
+        new = BaseModel.from_dict(bm.to_dict(save_fs=1))
+        self.assertIs(type(new), BaseModel)
+        self.assertNotIn("__class__", new.__dict__)
+        self.assertEqual(new.id, bm.id)
+        self.assertEqual(new.name, "Holberton")
+        self.assertEqual(new.created_at, bm.created_at)
+        self.assertEqual(new.updated_at, bm.updated_at)
+
+    def test_compact_metaclass(self):
+        """Test that Compact moves the plain class attributes to slots"""
+        class Thing(metaclass=models.base_model.Compact):
+            __slots__ = ("_extra", "id")
+            name = ""
+            number = 0
+
+            def method(self):
+                """a method is not a default"""
+
+        self.assertEqual(Thing._defaults, {"name": "", "number": 0})
+        self.assertEqual(Thing._fields, ("id", "name", "number"))
+        self.assertEqual(Thing.__slots__, ("_extra", "id", "name", "number"))
+        self.assertIsNot(type(vars(Thing)["name"]), str)
+        self.assertTrue(callable(Thing.method))
+
+    @unittest.skipIf(not models.base_model.compact, "not in compact mode")
+    def test_compact_attributes(self):
+        """Test that compact instances keep the attribute API"""
+        bm = BaseModel()
+        self.assertFalse(hasattr(bm, "name"))
+        bm.name = "Holberton"
+        self.assertEqual(bm.name, "Holberton")
+        self.assertEqual(bm.__dict__["name"], "Holberton")
+        self.assertEqual(bm.to_dict()["name"], "Holberton")
+        self.assertEqual(BaseModel.from_dict(bm.to_dict()).name, "Holberton")
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
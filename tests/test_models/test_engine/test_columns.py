@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""
+Contains the TestColumnsDocs and TestColumns classes
+"""
+
+import inspect
+from math import isnan
+from models.engine import columns
+import pep8
+import unittest
+
+
+class TestColumnsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of columns"""
+    def test_pep8_conformance_columns(self):
+        """Test that models/engine/columns.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_columns(self):
+        """Test tests/test_models/test_engine/test_columns.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_columns_module_docstring(self):
+        """Test for the columns.py module docstring"""
+        self.assertIsNot(columns.__doc__, None,
+                         "columns.py needs a docstring")
+        self.assertTrue(len(columns.__doc__) >= 1,
+                        "columns.py needs a docstring")
+
+    def test_columns_docstrings(self):
+        """Test for the presence of docstrings in columns"""
+        for func in (columns.number, columns.select):
+            self.assertTrue(len(func.__doc__) >= 1)
+        for name, func in inspect.getmembers(columns.Columns,
+                                             inspect.isfunction):
+            with self.subTest(name=name):
+                self.assertTrue(len(func.__doc__) >= 1)
+
+
+class Row:
+    """Object with numeric attributes"""
+    def __init__(self, **kwargs):
+        """Sets the attributes of kwargs"""
+        self.__dict__.update(kwargs)
+
+
+class TestColumns(unittest.TestCase):
+    """Test the Columns class"""
+    def setUp(self):
+        """Fills columns with a few rows"""
+        self.table = columns.Columns(("price", "rooms"))
+        self.table.put("a", Row(price=30, rooms=2))
+        self.table.put("b", Row(price=10))
+        self.table.put("c", Row(price="n/a", rooms=1))
+
+    def test_number(self):
+        """Test that values that are not numbers are NaN"""
+        self.assertEqual(columns.number(3), 3.0)
+        self.assertEqual(columns.number("2.5"), 2.5)
+        for value in (None, "n/a", True, [1]):
+            with self.subTest(value=value):
+                self.assertTrue(isnan(columns.number(value)))
+
+    def test_query_ranges(self):
+        """Test that query keeps the rows within every range"""
+        self.assertEqual(self.table.query({"price": (5, 50)}), ["a", "b"])
+        self.assertEqual(self.table.query({"price": (None, 20)}), ["b"])
+        self.assertEqual(self.table.query({"price": (0, None),
+                                           "rooms": (2, 2)}), ["a"])
+        self.assertEqual(self.table.query({}), ["a", "b", "c"])
+
+    def test_query_order(self):
+        """Test that query sorts the rows, those without a number last"""
+        self.assertEqual(self.table.query({}, "price"), ["b", "a", "c"])
+        self.assertEqual(self.table.query({}, "price", True), ["a", "b", "c"])
+
+    def test_update_and_remove(self):
+        """Test that rows follow updates and reuse the rows removed"""
+        self.table.update("b", "price", 99)
+        self.assertEqual(self.table.query({}, "price"), ["a", "b", "c"])
+        self.table.remove("a")
+        self.assertEqual(self.table.query({"price": (0, None)}), ["b"])
+        self.table.put("d", Row(price=1, rooms=1))
+        self.assertEqual(len(self.table.keys), 3)
+        self.assertEqual(self.table.query({}, "price"), ["d", "b", "c"])
+
+    def test_extend(self):
+        """Test that extend sorts the rows as put does one at a time"""
+        table = columns.Columns(("price", "rooms"))
+        table.extend([("a", Row(price=30, rooms=2)), ("b", Row(price=10)),
+                      ("c", Row(price="n/a", rooms=1))])
+        self.assertEqual(table.sorted, self.table.sorted)
+        self.assertEqual(table.query({"price": (5, 50)}, "price"),
+                         ["b", "a"])
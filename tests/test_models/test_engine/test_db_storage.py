@@ -24,6 +24,29 @@ classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
 
 
+class QueryCounter:
+    """Context manager counting the SQL statements run by the storage"""
+
+    def __enter__(self):
+        """starts counting the statements sent to the engine"""
+        import sqlalchemy
+        self.count = 0
+        self.engine = models.storage._DBStorage__engine
+        sqlalchemy.event.listen(self.engine, "before_cursor_execute",
+                                self.executed)
+        return self
+
+    def executed(self, *args):
+        """counts one statement"""
+        self.count += 1
+
+    def __exit__(self, *exc):
+        """stops counting"""
+        import sqlalchemy
+        sqlalchemy.event.remove(self.engine, "before_cursor_execute",
+                                self.executed)
+
+
 class TestDBStorageDocs(unittest.TestCase):
     """Tests to check the documentation and style of DBStorage class"""
     @classmethod
@@ -108,3 +131,290 @@ class TestFileStorage(unittest.TestCase):
         storage.save()
         c = storage.count()
         self.assertEqual(len(storage.all()), c)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_counts(self):
+        """Test that counts matches the rows of every table"""
+        counts = models.storage.counts()
+        for name, cls in classes.items():
+            self.assertEqual(counts[name], len(models.storage.all(cls)))
+            self.assertEqual(models.storage.count(cls), counts[name])
+        self.assertIsNone(models.storage.get(State, "missing"))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_cached(self):
+        """Test that cached values outlive the session until updated_at
+        changes"""
+        storage = models.storage
+        builds = []
+
+        def build(obj):
+            builds.append(obj)
+            return obj.name
+        state = State(name="Hidalgo")
+        storage.new(state)
+        storage.save()
+        try:
+            storage.close()
+            self.assertEqual(storage.cached(storage.get(State, state.id),
+                                            build), "Hidalgo")
+            storage.close()
+            self.assertEqual(storage.cached(storage.get(State, state.id),
+                                            build), "Hidalgo")
+            self.assertEqual(len(builds), 1)
+            state = storage.get(State, state.id)
+            state.name = "Morelos"
+            self.assertEqual(storage.cached(state, build), "Morelos")
+            state.save()
+            storage.close()
+            self.assertEqual(storage.cached(storage.get(State, state.id),
+                                            build), "Morelos")
+        finally:
+            storage.close()
+            storage.delete(storage.get(State, state.id))
+            storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_version(self):
+        """Test that versions count the committed changes of each class"""
+        storage = models.storage
+        storage.close()
+        before, city = storage.version(State), storage.version(City)
+        everything = storage.version()
+        state = State(name="Colima")
+        storage.new(state)
+        storage.save()
+        try:
+            storage.close()
+            self.assertNotEqual(storage.version(State)[0], before[0])
+            self.assertIsNone(storage.version(State)[1])
+            self.assertNotEqual(storage.version()[0], everything[0])
+            self.assertEqual(storage.version(City), city)
+            before = storage.version("State")
+            storage.close()
+            state = storage.get(State, state.id)
+            state.name = "Jalisco"
+            storage.close()
+            self.assertEqual(storage.version(State), before)
+            state = storage.get(State, state.id)
+            state.name = "Jalisco"
+            storage.save()
+            storage.close()
+            self.assertNotEqual(storage.version(State), before)
+        finally:
+            storage.close()
+            storage.delete(storage.get(State, state.id))
+            storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db' or
+                     not os.getenv('HBNB_DB_URL', '').startswith('sqlite'),
+                     "not testing sqlite storage")
+    def test_sqlite_pragmas(self):
+        """Test that SQLite connections enforce the foreign keys"""
+        engine = models.storage._DBStorage__engine
+        with engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql(
+                "PRAGMA foreign_keys").scalar(), 1)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_pool_stats(self):
+        """Test that pool_stats reports the pool of the engine"""
+        models.storage.count(State)
+        stats = models.storage.pool_stats()
+        self.assertIn("pool", stats)
+        if stats["pool"] == "TimedPool":
+            self.assertGreaterEqual(stats["checkouts"], 1)
+            self.assertLessEqual(stats["max_wait_ms"], stats["wait_ms"])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_eager_loading(self):
+        """Test that eager paths load relationships in constant queries"""
+        user = User(email="eager@hbnb.io", password="pwd")
+        amenity = Amenity(name="Wifi")
+        states = [State(name="Eager {}".format(i)) for i in range(3)]
+        objs = [user, amenity] + states
+        for state in states:
+            for i in range(2):
+                city = City(name="City {}".format(i), state_id=state.id)
+                place = Place(name="Place", city_id=city.id,
+                              user_id=user.id)
+                place.amenities.append(amenity)
+                objs += [city, place]
+        for obj in objs:
+            models.storage.new(obj)
+        models.storage.save()
+        try:
+            models.storage.close()
+            with QueryCounter() as queries:
+                for state in models.storage.all(State, "cities").values():
+                    [city.name for city in state.cities]
+            self.assertEqual(queries.count, 2)
+            models.storage.close()
+            with QueryCounter() as queries:
+                for place in models.storage.all(Place, "user").values():
+                    place.user.first_name
+            self.assertEqual(queries.count, 1)
+            models.storage.close()
+            with QueryCounter() as queries:
+                state = models.storage.get(State, states[0].id,
+                                           "cities.places.amenities")
+                names = [amenity.name for city in state.cities
+                         for place in city.places
+                         for amenity in place.amenities]
+            self.assertEqual(names, ["Wifi", "Wifi"])
+            self.assertEqual(queries.count, 4)
+        finally:
+            models.storage.close()
+            for state in states:
+                models.storage.delete(models.storage.get(State, state.id))
+            for cls, obj in ((Amenity, amenity), (User, user)):
+                models.storage.delete(models.storage.get(cls, obj.id))
+            models.storage.save()
+
+    def batched_storage(self, folder):
+        """Returns a DBStorage batching its saves, on a database in folder"""
+        url = os.environ.get("HBNB_DB_URL")
+        os.environ["HBNB_DB_URL"] = "sqlite:///" + os.path.join(
+            folder, "batch.db")
+        try:
+            storage = DBStorage()
+        finally:
+            if url is None:
+                del os.environ["HBNB_DB_URL"]
+            else:
+                os.environ["HBNB_DB_URL"] = url
+        storage._DBStorage__batch_ms = 50
+        storage.reload()
+        return storage
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_batched_save(self):
+        """Test that batched saves of several sessions share one commit"""
+        import sqlalchemy
+        import tempfile
+        import threading
+        with tempfile.TemporaryDirectory() as folder:
+            storage = self.batched_storage(folder)
+            engine = storage._DBStorage__engine
+            commits = []
+            sqlalchemy.event.listen(engine, "commit", commits.append)
+            states = [State(name="Batch {}".format(i)) for i in range(8)]
+
+            def work(state):
+                storage.new(state)
+                storage.save()
+                storage.close()
+            try:
+                threads = [threading.Thread(target=work, args=(state,))
+                           for state in states]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                self.assertLess(len(commits), len(states))
+                self.assertEqual(storage.count(State), len(states))
+                storage.close()
+                state = storage.get(State, states[0].id)
+                state.name = "Batched"
+                storage.delete(storage.get(State, states[1].id))
+                storage.save()
+                storage.close()
+                self.assertEqual(storage.get(State, states[0].id).name,
+                                 "Batched")
+                self.assertIsNone(storage.get(State, states[1].id))
+                storage.close()
+                storage.new(City(name="Nowhere"))
+                self.assertRaises(sqlalchemy.exc.IntegrityError,
+                                  storage.save)
+                storage.close()
+                storage.new(State(name="After"))
+                storage.save()
+                storage.close()
+                self.assertEqual(storage.count(State), len(states))
+            finally:
+                storage.close()
+                storage._DBStorage__writer.close()
+                engine.dispose()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_batched_delete_cascade(self):
+        """Test that batched deletes cascade to the children of the object"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as folder:
+            storage = self.batched_storage(folder)
+            try:
+                user = User(email="cascade@hbnb.io", password="pwd")
+                state = State(name="Cascade")
+                city = City(name="Cascade", state_id=state.id)
+                place = Place(name="Cascade", city_id=city.id,
+                              user_id=user.id)
+                reviews = [Review(text="Review {}".format(i),
+                                  place_id=place.id, user_id=user.id)
+                           for i in range(2)]
+                for obj in [user, state, city, place] + reviews:
+                    storage.new(obj)
+                storage.save()
+                self.assertIs(storage.get(Place, place.id), place)
+                storage.close()
+                storage.get(Place, place.id).reviews
+                storage.delete(storage.get(Place, place.id))
+                storage.save()
+                storage.close()
+                self.assertIsNone(storage.get(Place, place.id))
+                self.assertEqual(storage.count(Review), 0)
+                storage.get(State, state.id).cities
+                storage.delete(storage.get(State, state.id))
+                storage.save()
+                storage.close()
+                self.assertIsNone(storage.get(State, state.id))
+                self.assertIsNone(storage.get(City, city.id))
+                self.assertIsNotNone(storage.get(User, user.id))
+            finally:
+                storage.close()
+                storage._DBStorage__writer.close()
+                storage._DBStorage__engine.dispose()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_search(self):
+        """Test that search filters states, cities and amenities in SQL"""
+        storage = models.storage
+        user = User(email="search@hbnb.io", password="pwd")
+        state = State(name="Sonora")
+        cities = [City(name="Hermosillo", state_id=state.id),
+                  City(name="Nogales", state_id=state.id)]
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        places = [Place(name="a", city_id=cities[0].id, user_id=user.id),
+                  Place(name="b", city_id=cities[1].id, user_id=user.id,
+                        price_by_night=10),
+                  Place(name="c", city_id=cities[1].id, user_id=user.id,
+                        price_by_night=5)]
+        places[0].amenities.append(wifi)
+        places[1].amenities.extend([wifi, pool])
+        for obj in [user, state, wifi, pool] + cities + places:
+            storage.new(obj)
+        storage.save()
+        try:
+            def names(**kwargs):
+                with QueryCounter() as queries:
+                    found = storage.search(**kwargs)
+                self.assertEqual(queries.count, 1)
+                return sorted(p.name for p in found)
+            self.assertEqual(names(states=[state.id]), ["a", "b", "c"])
+            self.assertEqual(names(states=[state.id],
+                                   cities=[cities[1].id]), ["a", "b", "c"])
+            self.assertEqual(names(cities=[cities[1].id]), ["b", "c"])
+            self.assertEqual(names(states=[state.id], amenities=[wifi.id]),
+                             ["a", "b"])
+            self.assertEqual(names(amenities=[wifi.id, pool.id, wifi.id]),
+                             ["b"])
+            self.assertEqual(names(amenities=[wifi.id, "missing"]), [])
+            self.assertEqual(names(states=["missing"]), [])
+            found = storage.search(cities=[cities[1].id],
+                                   order="price_by_night")
+            self.assertEqual([p.name for p in found], ["c", "b"])
+        finally:
+            storage.close()
+            storage.delete(storage.get(State, state.id))
+            for obj in (wifi, pool, user):
+                storage.delete(storage.get(obj.__class__, obj.id))
+            storage.save()
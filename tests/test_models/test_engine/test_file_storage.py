@@ -17,6 +17,9 @@ from models.user import User
 import json
 import os
 import pep8
+import sys
+import threading
+import time
 import unittest
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
@@ -70,6 +73,25 @@ test_file_storage.py'])
 
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
+    def setUp(self):
+        """Writes every save right away to file.json, whatever the
+        environment says"""
+        self.journal = FileStorage._FileStorage__journal
+        self.behind_ms = FileStorage._FileStorage__behind_ms
+        self.format = FileStorage._FileStorage__format
+        self.file_path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__behind_ms = 0
+        FileStorage._FileStorage__format = "json"
+        FileStorage._FileStorage__file_path = "file.json"
+
+    def tearDown(self):
+        """Restores the save mode of the environment"""
+        FileStorage._FileStorage__journal = self.journal
+        FileStorage._FileStorage__behind_ms = self.behind_ms
+        FileStorage._FileStorage__format = self.format
+        FileStorage._FileStorage__file_path = self.file_path
+
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_all_returns_dict(self):
         """Test that all returns the FileStorage.__objects attr"""
@@ -139,3 +161,650 @@ class TestFileStorage(unittest.TestCase):
         storage.save()
         c = storage.count()
         self.assertEqual(len(storage.all()), c)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_counts(self):
+        """Test that counts matches count for every class"""
+        storage = FileStorage()
+        counts = storage.counts()
+        for name in classes:
+            self.assertEqual(counts[name], storage.count(name))
+        self.assertEqual(sum(counts.values()), storage.count())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get_by_key(self):
+        """Test that get resolves the object by class and id only"""
+        storage = FileStorage()
+        state = State(name="Jalisco")
+        city = City(name="Guadalajara", id=state.id)
+        storage.new(state)
+        storage.new(city)
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertIs(storage.get(City, state.id), city)
+        self.assertIsNone(storage.get(Place, state.id))
+        self.assertIsNone(storage.get(State, "missing"))
+        self.assertIsNone(storage.get("State", state.id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_partition(self):
+        """Test that all(cls) and count(cls) follow new and delete"""
+        storage = FileStorage()
+        before = storage.count(Amenity)
+        amenity = Amenity(name="Wifi")
+        storage.new(amenity)
+        key = "Amenity." + amenity.id
+        self.assertIs(storage.all(Amenity)[key], amenity)
+        self.assertIs(storage.all("Amenity")[key], amenity)
+        self.assertNotIn(key, storage.all(State))
+        self.assertEqual(storage.count(Amenity), before + 1)
+        storage.delete(amenity)
+        self.assertNotIn(key, storage.all(Amenity))
+        self.assertEqual(storage.count(Amenity), before)
+        self.assertEqual(storage.all("Nothing"), {})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_copy(self):
+        """Test that all(cls) and related() return copies of the store"""
+        storage = FileStorage()
+        state = State(name="Oaxaca")
+        cities = [City(name="Oaxaca", state_id=state.id),
+                  City(name="Tuxtepec", state_id=state.id)]
+        for obj in [state] + cities:
+            storage.new(obj)
+        count = storage.count(City)
+        storage.all(City).clear()
+        storage.related(City, "state_id", state.id).clear()
+        self.assertEqual(storage.count(City), count)
+        self.assertEqual(len(state.cities), 2)
+        for city in storage.related(City, "state_id", state.id).values():
+            storage.delete(city)
+        self.assertEqual(state.cities, [])
+        for obj in storage.all(State).values():
+            if obj is state:
+                storage.delete(obj)
+        self.assertNotIn("State." + state.id, storage.all())
+        self.assertEqual(storage.count(City), count - 2)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related_follows_foreign_keys(self):
+        """Test that the reverse indexes follow new, delete and setattr"""
+        storage = models.storage
+        state = State(name="Jalisco")
+        other = State(name="Colima")
+        city = City(name="Guadalajara", state_id=state.id)
+        storage.new(state)
+        storage.new(other)
+        storage.new(city)
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(other.cities, [])
+        city.state_id = other.id
+        self.assertEqual(state.cities, [])
+        self.assertEqual(other.cities, [city])
+        place = Place(name="Casa", city_id=city.id)
+        storage.new(place)
+        self.assertEqual(city.places, [place])
+        storage.delete(city)
+        storage.delete(place)
+        self.assertEqual(other.cities, [])
+        self.assertEqual(city.places, [])
+        storage.delete(state)
+        storage.delete(other)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related_skips_unhashable(self):
+        """Test that the indexes leave out values that are not ids"""
+        storage = models.storage
+        amenity = Amenity(name="Wifi")
+        place = Place(name="Casa", amenity_ids=[{"x": 1}, amenity.id])
+        storage.new(place)
+        try:
+            self.assertIn("Place." + place.id, storage.all(Place))
+            self.assertEqual(list(storage.related(Place, "amenity_ids",
+                                                  amenity.id).values()),
+                             [place])
+            place.amenity_ids = [[amenity.id], {"x": 1}]
+            self.assertEqual(storage.related(Place, "amenity_ids",
+                                             amenity.id), {})
+            place.amenity_ids = [amenity.id]
+            self.assertEqual(list(storage.related(Place, "amenity_ids",
+                                                  amenity.id).values()),
+                             [place])
+        finally:
+            storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """Test that page walks the objects of a class in id order"""
+        storage = models.storage
+        state = State(name="Yucatan")
+        cities = [City(name=str(i), state_id=state.id) for i in range(5)]
+        objs = [state] + cities
+        for obj in objs:
+            storage.new(obj)
+        try:
+            ids = sorted(city.id for city in cities)
+            ours = [c.id for c in storage.page(City) if c in cities]
+            self.assertEqual(ours, ids)
+            first = storage.page(City, 2, attr="state_id", value=state.id)
+            self.assertEqual([c.id for c in first], ids[:2])
+            rest = storage.page(City, None, ids[1], "state_id", state.id)
+            self.assertEqual([c.id for c in rest], ids[2:])
+            storage.delete(cities[0])
+            later = City(name="5", state_id=state.id)
+            objs.append(later)
+            storage.new(later)
+            ours = [c.id for c in storage.page(City) if c in objs]
+            ids.remove(cities[0].id)
+            self.assertEqual(ours, sorted(ids + [later.id]))
+        finally:
+            for obj in objs:
+                storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_cached(self):
+        """Test that cached values last until their object changes"""
+        storage = models.storage
+        state = State(name="Sinaloa")
+        self.assertIsNot(storage.cached(state, State.to_dict),
+                         storage.cached(state, State.to_dict))
+        storage.new(state)
+        try:
+            first = storage.cached(state, State.to_dict)
+            self.assertIs(storage.cached(state, State.to_dict), first)
+            state.name = "Durango"
+            second = storage.cached(state, State.to_dict)
+            self.assertEqual(second["name"], "Durango")
+            self.assertIs(storage.cached(state, State.to_dict), second)
+            other = State(id=state.id, name="Zacatecas")
+            storage.new(other)
+            self.assertEqual(storage.cached(other, State.to_dict)["name"],
+                             "Zacatecas")
+            self.assertEqual(storage.cached(state, State.to_dict)["name"],
+                             "Durango")
+        finally:
+            storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_cached_across_reloads(self):
+        """Test that reloading unchanged files keeps the cached values"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__file_path = "test_cached.json"
+        state = State(name="Hidalgo")
+        storage.new(state)
+        key = "State." + state.id
+        try:
+            storage.save()
+            storage.reload()
+            first = storage.cached(storage.all()[key], State.to_dict)
+            storage.reload()
+            self.assertIs(storage.cached(storage.all()[key], State.to_dict),
+                          first)
+            with open("test_cached.json", "a") as f:
+                f.write("\n")
+            storage.reload()
+            self.assertIsNot(storage.cached(storage.all()[key],
+                                            State.to_dict), first)
+        finally:
+            FileStorage._FileStorage__file_path = path
+            storage.delete(storage.all()[key])
+            if os.path.exists("test_cached.json"):
+                os.remove("test_cached.json")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_version(self):
+        """Test that versions change with the objects of their class"""
+        storage = models.storage
+        state = State(name="Colima")
+        before, everything = storage.version(State), storage.version()
+        city = storage.version(City)
+        storage.new(state)
+        try:
+            self.assertNotEqual(storage.version(State)[0], before[0])
+            self.assertGreaterEqual(storage.version(State)[1], before[1])
+            self.assertNotEqual(storage.version()[0], everything[0])
+            self.assertEqual(storage.version(City), city)
+            before = storage.version("State")
+            self.assertEqual(storage.version(State), before)
+            state.name = "Jalisco"
+            self.assertNotEqual(storage.version(State)[0], before[0])
+            before = storage.version(State)
+        finally:
+            storage.delete(state)
+        self.assertNotEqual(storage.version(State)[0], before[0])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search(self):
+        """Test that search intersects states, cities and amenities"""
+        storage = models.storage
+        state = State(name="Sonora")
+        cities = [City(name="Hermosillo", state_id=state.id),
+                  City(name="Nogales", state_id=state.id)]
+        places = [Place(name="a", city_id=cities[0].id, amenity_ids=["w"]),
+                  Place(name="b", city_id=cities[1].id,
+                        amenity_ids=["w", "p"], price_by_night=10),
+                  Place(name="c", city_id=cities[1].id, price_by_night=5)]
+        objs = [state] + cities + places
+        for obj in objs:
+            storage.new(obj)
+        try:
+            def names(**kwargs):
+                return sorted(p.name for p in storage.search(**kwargs))
+            self.assertEqual(names(states=[state.id]), ["a", "b", "c"])
+            self.assertEqual(names(states=[state.id],
+                                   cities=[cities[1].id]), ["a", "b", "c"])
+            self.assertEqual(names(cities=[cities[1].id]), ["b", "c"])
+            self.assertEqual(names(states=[state.id], amenities=["w"]),
+                             ["a", "b"])
+            self.assertEqual(names(amenities=["w", "p"]), ["b"])
+            self.assertEqual(names(amenities=["w", "missing"]), [])
+            self.assertEqual(names(states=["missing"]), [])
+            found = storage.search(cities=[cities[1].id],
+                                   order="price_by_night")
+            self.assertEqual([p.name for p in found], ["c", "b"])
+            places[2].amenity_ids = ["p"]
+            self.assertEqual(names(amenities=["p"]), ["b", "c"])
+            places[1].amenity_ids = []
+            self.assertEqual(names(amenities=["p"]), ["c"])
+        finally:
+            for obj in objs:
+                storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_query(self):
+        """Test that query filters and sorts with and without columns"""
+        storage = models.storage
+        columnar = FileStorage._FileStorage__columnar
+        places = [Place(name="a", price_by_night=80, latitude=1.5),
+                  Place(name="b", price_by_night=20),
+                  Place(name="c", price_by_night="n/a"),
+                  Place(name="d", price_by_night=50, latitude=-3.0)]
+        for place in places:
+            storage.new(place)
+        try:
+            for flag in (False, True):
+                FileStorage._FileStorage__columnar = flag
+                found = storage.query(Place, {"price_by_night": (30, None)},
+                                      "price_by_night")
+                self.assertEqual([p.name for p in found if p in places],
+                                 ["d", "a"])
+                found = storage.query(Place, {"latitude": (None, 2)},
+                                      "latitude", reverse=True)
+                self.assertEqual([p.name for p in found if p in places],
+                                 ["a", "b", "c", "d"])
+                places[1].price_by_night = 90
+                found = storage.query(Place, {}, "price_by_night", True)
+                self.assertEqual([p.name for p in found if p in places],
+                                 ["b", "a", "d", "c"])
+                places[1].price_by_night = 20
+            storage.delete(places[0])
+            found = storage.query(Place, {"price_by_night": (0, 100)})
+            self.assertNotIn(places[0], found)
+            self.assertEqual(len(storage.query(Place)), storage.count(Place))
+        finally:
+            FileStorage._FileStorage__columnar = columnar
+            FileStorage._FileStorage__columns.clear()
+            for place in places:
+                storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_query_after_reload(self):
+        """Test that reload drops the columns, rebuilt by the next query"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        columnar = FileStorage._FileStorage__columnar
+        FileStorage._FileStorage__file_path = "test_columns.json"
+        FileStorage._FileStorage__columnar = True
+        places = [Place(name="a", price_by_night=80),
+                  Place(name="b", price_by_night=75)]
+        storage.new(places[0])
+        try:
+            storage.save()
+            storage.query(Place, {"price_by_night": (70, 90)})
+            self.assertIn("Place", FileStorage._FileStorage__columns)
+            # unsaved, so that reload reads the file again
+            storage.new(places[1])
+            storage.reload()
+            self.assertNotIn("Place", FileStorage._FileStorage__columns)
+            found = storage.query(Place, {"price_by_night": (70, 90)})
+            self.assertEqual(sorted(p.name for p in found
+                                    if p.id in (places[0].id, places[1].id)),
+                             ["a", "b"])
+        finally:
+            FileStorage._FileStorage__columnar = columnar
+            FileStorage._FileStorage__file_path = path
+            FileStorage._FileStorage__columns.clear()
+            for place in places:
+                storage.delete(storage.get(Place, place.id))
+            if os.path.exists("test_columns.json"):
+                os.remove("test_columns.json")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal(self):
+        """Test that journal mode appends only the changed objects"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__file_path = "test_journal.json"
+        try:
+            storage.save()
+            if os.path.exists("test_journal.json.log"):
+                os.remove("test_journal.json.log")
+            state = State(name="Sonora")
+            state.save()
+            state.name = "Sinaloa"
+            storage.save()
+            with open("test_journal.json.log", "r") as f:
+                lines = [json.loads(line) for line in f]
+            key = "State." + state.id
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(lines[1][key]["name"], "Sinaloa")
+            storage.delete(state)
+            storage.save()
+            storage.new(state)
+            storage.reload()
+            self.assertNotIn(key, storage.all())
+            storage.new(state)
+            storage.save()
+            storage.compact()
+            self.assertFalse(os.path.exists("test_journal.json.log"))
+            with open("test_journal.json", "r") as f:
+                self.assertEqual(json.load(f)[key]["name"], "Sinaloa")
+            storage.delete(state)
+        finally:
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__file_path = path
+            for name in ("test_journal.json", "test_journal.json.log"):
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_concurrent_compaction(self):
+        """Test that saves from several threads compact the journal safely"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        journal_max = FileStorage._FileStorage__journal_max
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_max = 0
+        FileStorage._FileStorage__file_path = "test_journal.json"
+        errors = []
+        excepthook = threading.excepthook
+        threading.excepthook = errors.append
+        # switches threads as often as possible to expose races
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        states = []
+
+        def work():
+            for i in range(100):
+                state = State(name=str(i))
+                states.append(state)
+                storage.new(state)
+                state.name = "Sonora"
+                storage.save()
+        try:
+            threads = [threading.Thread(target=work) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # waits for the compaction in flight, then folds what is left
+            with FileStorage._FileStorage__compacting:
+                pass
+            storage.compact()
+            self.assertEqual(errors, [])
+            self.assertFalse(os.path.exists("test_journal.json.log"))
+            with open("test_journal.json", "r") as f:
+                saved = json.load(f)
+            for state in states:
+                self.assertIn("State." + state.id, saved)
+        finally:
+            sys.setswitchinterval(interval)
+            threading.excepthook = excepthook
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__journal_max = journal_max
+            FileStorage._FileStorage__file_path = path
+            for state in states:
+                storage.delete(state)
+            for name in ("test_journal.json", "test_journal.json.log",
+                         "test_journal.json.log.old"):
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_changed_attributes(self):
+        """Test that the journal holds only the attributes that changed"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__file_path = "test_journal.json"
+        try:
+            place = Place(name="Casa", number_rooms=3)
+            storage.new(place)
+            storage.save()
+            os.remove("test_journal.json.log")
+            place.number_rooms = 4
+            place.number_rooms = 4
+            storage.save()
+            with open("test_journal.json.log", "r") as f:
+                lines = [json.loads(line) for line in f]
+            key = "Place." + place.id
+            self.assertEqual(lines, [{key: {"__class__": "Place",
+                                            "id": place.id,
+                                            "number_rooms": 4}}])
+            with open("test_journal.json.log", "w") as f:
+                f.write(json.dumps({key: place.to_dict(save_fs=1)}) + "\n")
+                lines[0][key]["number_rooms"] = 5
+                f.write(json.dumps(lines[0]) + "\n")
+            storage.reload()
+            self.assertEqual(storage.all()[key].number_rooms, 5)
+            self.assertEqual(storage.all()[key].name, "Casa")
+            storage.delete(storage.all()[key])
+        finally:
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__file_path = path
+            for name in ("test_journal.json", "test_journal.json.log"):
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_durability(self):
+        """Test that save replaces the file atomically under each policy"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__file_path = "test_durable.json"
+        try:
+            for policy in ("none", "always", "group"):
+                with self.subTest(policy=policy):
+                    FileStorage._FileStorage__durability = policy
+                    storage.save()
+                    self.assertFalse(os.path.exists("test_durable.json.tmp"))
+                    with open("test_durable.json", "r") as f:
+                        self.assertEqual(len(json.load(f)),
+                                         len(storage.all()))
+            storage.sync()
+            self.assertEqual(FileStorage._FileStorage__unsynced, set())
+            with open("test_durable.json", "w") as f:
+                f.write('{"State.1": {"__cla')
+            self.assertRaises(ValueError, storage.reload)
+        finally:
+            FileStorage._FileStorage__durability = "none"
+            FileStorage._FileStorage__file_path = path
+            if os.path.exists("test_durable.json"):
+                os.remove("test_durable.json")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_write_behind(self):
+        """Test that write-behind saves are coalesced into one write"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__behind_ms = 500
+        FileStorage._FileStorage__file_path = "test_behind.json"
+        errors = []
+        excepthook = threading.excepthook
+        threading.excepthook = errors.append
+        state = State(name="Baja California")
+        key = "State." + state.id
+        try:
+            storage.save()
+            storage.save()
+            self.assertFalse(os.path.exists("test_behind.json"))
+            storage.save(wait=True)
+            self.assertTrue(os.path.exists("test_behind.json"))
+            FileStorage._FileStorage__behind_ms = 50
+            storage.new(state)
+            storage.save()
+            # the pending save holds objects newer than the file
+            storage.reload()
+            self.assertIs(storage.all()[key], state)
+            storage.save(wait=True)
+            with open("test_behind.json", "r") as f:
+                self.assertIn(key, json.load(f))
+            FileStorage._FileStorage__file_path = "missing/test_behind.json"
+            storage.delete(state)
+            self.assertRaises(FileNotFoundError, storage.save, True)
+            FileStorage._FileStorage__file_path = "test_behind.json"
+            self.assertGreaterEqual(len(errors), 1)
+            # the failed flush is retried without another save
+            behind = FileStorage._FileStorage__behind
+            for _ in range(100):
+                if not behind.pending():
+                    break
+                time.sleep(0.02)
+            self.assertFalse(behind.pending())
+            with open("test_behind.json", "r") as f:
+                self.assertNotIn(key, json.load(f))
+        finally:
+            threading.excepthook = excepthook
+            FileStorage._FileStorage__behind_ms = 0
+            FileStorage._FileStorage__file_path = path
+            storage.delete(state)
+            if os.path.exists("test_behind.json"):
+                os.remove("test_behind.json")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_formats(self):
+        """Test that reload reads both the line-per-object and the
+        single-line layouts of the JSON file"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__file_path = "test_reload.json"
+        state = State(name="Durango")
+        key = "State." + state.id
+        record = state.to_dict(save_fs=1)
+        try:
+            for dump in (json.dumps({key: record}),
+                         '{\n' + json.dumps(key) + ': ' +
+                         json.dumps(record) + '\n}\n'):
+                with self.subTest(dump=dump[:2]):
+                    with open("test_reload.json", "w") as f:
+                        f.write(dump)
+                    storage.reload()
+                    self.assertEqual(storage.all()[key].name, "Durango")
+                    storage.delete(storage.all()[key])
+        finally:
+            FileStorage._FileStorage__file_path = path
+            if os.path.exists("test_reload.json"):
+                os.remove("test_reload.json")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_lazy_reload(self):
+        """Test that lazy mode builds objects only when they are accessed"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__file_path = "test_lazy.json"
+        FileStorage._FileStorage__lazy = True
+        state = State(name="Nayarit")
+        city = City(name="Tepic", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        keys = ["State." + state.id, "City." + city.id]
+        try:
+            storage.save()
+            count = storage.count()
+            storage.reload()
+            objects = FileStorage._FileStorage__objects
+            self.assertNotIn(keys[0], objects)
+            self.assertNotIn(keys[1], objects)
+            self.assertEqual(storage.count(), count)
+            self.assertEqual(storage.get(State, state.id).name, "Nayarit")
+            self.assertIn(keys[0], objects)
+            self.assertNotIn(keys[1], objects)
+            self.assertEqual(storage.get(State, state.id).cities[0].name,
+                             "Tepic")
+            self.assertIn(keys[1], objects)
+            storage.reload()
+            storage.save()
+            storage.reload()
+            self.assertEqual(storage.count(), count)
+            self.assertIn(keys[1], storage.all())
+        finally:
+            FileStorage._FileStorage__lazy = False
+            FileStorage._FileStorage__file_path = path
+            for key in keys:
+                storage.delete(storage.all()[key])
+            if os.path.exists("test_lazy.json"):
+                os.remove("test_lazy.json")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_binary_format(self):
+        """Test that save and reload round-trip the binary format"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__file_path = "test_format.bin"
+        FileStorage._FileStorage__format = "binary"
+        state = State(name="Chiapas")
+        storage.new(state)
+        key = "State." + state.id
+        try:
+            storage.save()
+            with open("test_format.bin", "rb") as f:
+                self.assertEqual(f.read(5), b"HBNB\x01")
+            storage.delete(state)
+            storage.reload()
+            self.assertEqual(storage.all()[key].name, "Chiapas")
+            self.assertEqual(storage.all()[key].created_at, state.created_at)
+        finally:
+            FileStorage._FileStorage__format = "json"
+            FileStorage._FileStorage__file_path = path
+            storage.delete(storage.all()[key])
+            if os.path.exists("test_format.bin"):
+                os.remove("test_format.bin")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_mapped_format(self):
+        """Test that a mapped snapshot is served without building objects"""
+        storage = FileStorage()
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__file_path = "test_format.map"
+        FileStorage._FileStorage__format = "mapped"
+        state = State(name="Tabasco")
+        city = City(name="Villahermosa", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        keys = ["State." + state.id, "City." + city.id]
+        try:
+            storage.save()
+            count = storage.count(State)
+            storage.reload()
+            objects = FileStorage._FileStorage__objects
+            self.assertNotIn(keys[0], objects)
+            self.assertEqual(storage.count(State), count)
+            self.assertEqual(storage.get(State, state.id).name, "Tabasco")
+            self.assertIsNone(storage.get(State, "missing"))
+            self.assertEqual(storage.count(State), count)
+            self.assertEqual(storage.get(State, state.id).cities[0].name,
+                             "Villahermosa")
+            storage.reload()
+            self.assertIn(keys[1], objects)
+            storage.save()
+            storage.reload()
+            self.assertNotIn(keys[1], objects)
+            self.assertIn(keys[1], storage.all(City))
+        finally:
+            FileStorage._FileStorage__format = "json"
+            FileStorage._FileStorage__file_path = path
+            for key in keys:
+                storage.delete(storage.all()[key])
+            if os.path.exists("test_format.map"):
+                os.remove("test_format.map")
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializersDocs and TestSerializers classes
+"""
+
+from datetime import datetime
+import inspect
+import io
+import json
+import models
+import os
+from models.amenity import Amenity
+from models.engine import serializers
+from models.place import Place
+from models.state import State
+import pep8
+import pickle
+import struct
+import unittest
+
+
+class TestSerializersDocs(unittest.TestCase):
+    """Tests to check the documentation and style of serializers"""
+    def test_pep8_conformance_serializers(self):
+        """Test that models/engine/serializers.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_serializers(self):
+        """Test tests/test_models/test_engine/test_serializers.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_serializers_module_docstring(self):
+        """Test for the serializers.py module docstring"""
+        self.assertIsNot(serializers.__doc__, None,
+                         "serializers.py needs a docstring")
+        self.assertTrue(len(serializers.__doc__) >= 1,
+                        "serializers.py needs a docstring")
+
+    def test_formats_docstrings(self):
+        """Test for the presence of docstrings in the format classes"""
+        for cls in (serializers.JSONFormat, serializers.BinaryFormat,
+                    serializers.MappedFormat, serializers.MappedSnapshot,
+                    serializers.MappedTable):
+            self.assertTrue(len(cls.__doc__) >= 1)
+            for name, func in inspect.getmembers(cls, inspect.isfunction):
+                if name not in vars(cls):
+                    continue
+                with self.subTest(cls=cls, name=name):
+                    self.assertTrue(len(func.__doc__) >= 1)
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the snapshot formats"""
+    def setUp(self):
+        """Builds a few records to serialize"""
+        state = State(name="Oaxaca")
+        place = Place(name="Casa", number_rooms=2, amenity_ids=["a", "b"])
+        self.records = {}
+        for obj in (state, place):
+            key = obj.__class__.__name__ + "." + obj.id
+            self.records[key] = obj.to_dict(save_fs=1)
+
+    def round_trip(self, format):
+        """Dumps the records in format and loads them back"""
+        f = io.BytesIO()
+        serializers.formats[format].dump(self.records.items(), f)
+        f.seek(0)
+        return dict(serializers.load(f))
+
+    def test_json_round_trip(self):
+        """Test that the JSON format keeps every record"""
+        loaded = self.round_trip("json")
+        self.assertEqual(loaded.keys(), self.records.keys())
+        for key, record in loaded.items():
+            self.assertEqual(json.loads(record),
+                             self.records[key])
+
+    def test_binary_round_trip(self):
+        """Test that the binary format keeps every record"""
+        loaded = self.round_trip("binary")
+        self.assertEqual(loaded.keys(), self.records.keys())
+        for key, record in loaded.items():
+            self.assertIs(type(record["created_at"]), datetime)
+            self.assertEqual(record["created_at"].isoformat(),
+                             self.records[key]["created_at"])
+            record["created_at"] = self.records[key]["created_at"]
+            record["updated_at"] = self.records[key]["updated_at"]
+            self.assertEqual(record, self.records[key])
+
+    def test_binary_same_fields(self):
+        """Test that records of classes with the same fields keep their
+        class in the binary format"""
+        self.records = {}
+        for obj in (State(name="Oaxaca"), Amenity(name="Wifi"),
+                    State(name="Puebla")):
+            key = obj.__class__.__name__ + "." + obj.id
+            self.records[key] = obj.to_dict(save_fs=1)
+        loaded = self.round_trip("binary")
+        self.assertEqual(loaded.keys(), self.records.keys())
+        for key, record in loaded.items():
+            self.assertEqual(record["__class__"], key.partition(".")[0])
+            self.assertEqual(record["name"], self.records[key]["name"])
+
+    def test_binary_refuses_globals(self):
+        """Test that the binary format never loads arbitrary objects"""
+        frame = pickle.dumps(("State", ("id",), [[datetime.now()]]))
+        f = io.BytesIO(serializers.MAGIC + struct.pack(">I", len(frame)) +
+                       frame)
+        with self.assertRaises(pickle.UnpicklingError):
+            list(serializers.load(f))
+
+    def test_mapped_round_trip(self):
+        """Test that the mapped format keeps every record in key order"""
+        loaded = self.round_trip("mapped")
+        self.assertEqual(list(loaded), sorted(self.records))
+        for key, record in loaded.items():
+            self.assertEqual(json.loads(record), self.records[key])
+
+    def test_mapped_table(self):
+        """Test that a MappedTable hides the records replaced in memory"""
+        f = io.BytesIO()
+        serializers.formats["mapped"].dump(self.records.items(), f)
+        with open("test_serializers.map", "wb") as dump:
+            dump.write(f.getvalue())
+        try:
+            with open("test_serializers.map", "rb") as dump:
+                self.assertTrue(serializers.mapped(dump))
+                tables = serializers.MappedSnapshot(dump).tables()
+            table = tables["State"]
+            key = list(table)[0]
+            self.assertEqual(len(table), 1)
+            self.assertIn(key, table)
+            table[key] = {"name": "Puebla"}
+            self.assertEqual(len(table), 1)
+            self.assertEqual(table[key], {"name": "Puebla"})
+            self.assertIsNotNone(table.pop(key))
+            self.assertEqual(len(table), 0)
+            self.assertNotIn(key, table)
+            self.assertEqual(list(table), [])
+        finally:
+            os.remove("test_serializers.map")
@@ -85,6 +85,13 @@ class TestUser(unittest.TestCase):
         else:
             self.assertEqual(user.password, "")
 
+    def test_password_hashed_once(self):
+        """Test that a stored password is not hashed again when loaded"""
+        user = User(password="pwd")
+        self.assertEqual(user.password, "9003d1df22eb4d3820015070385194c8")
+        new = User.from_dict(user.to_dict(save_fs=1))
+        self.assertEqual(new.password, user.password)
+
     def test_first_name_attr(self):
         """Test that User has attr first_name, and it's an empty string"""
         user = User()
@@ -20,7 +20,7 @@ def close_db(error):
 @app.route('/2-hbnb/', strict_slashes=False)
 def hbnb():
     """ HBNB is alive! """
-    states = storage.all(State).values()
+    states = storage.all(State, "cities").values()
     states = sorted(states, key=lambda k: k.name)
     st_ct = []
 
@@ -30,7 +30,7 @@ def hbnb():
     amenities = storage.all(Amenity).values()
     amenities = sorted(amenities, key=lambda k: k.name)
 
-    places = storage.all(Place).values()
+    places = storage.all(Place, "user").values()
     places = sorted(places, key=lambda k: k.name)
 
     return render_template('0-hbnb.html',
@@ -122,7 +122,8 @@ def search_places():
     matched_places = []
 
     if states:
-        state_objects = [storage.get(State, s_id) for s_id in states]
+        state_objects = [storage.get(State, s_id, "cities.places.amenities")
+                         for s_id in states]
         for state in state_objects:
             if state:
                 for city in state.cities:
@@ -130,7 +131,8 @@ def search_places():
                         matched_places.extend(city.places)
 
     if cities:
-        city_objects = [storage.get(City, c_id) for c_id in cities]
+        city_objects = [storage.get(City, c_id, "places.amenities")
+                        for c_id in cities]
         for city in city_objects:
             if city:
                 for place in city.places:
@@ -139,7 +141,7 @@ def search_places():
 
     if amenities:
         if not matched_places:
-            matched_places = storage.all(Place).values()
+            matched_places = storage.all(Place, "amenities").values()
         amenity_objects = [storage.get(Amenity, a_id) for a_id in amenities]
         matched_places = [place for place in matched_places
                           if all(amenity in place.amenities
@@ -20,7 +20,7 @@ def close_db(error):
 @app.route('/hbnb_filters', strict_slashes=False)
 def hbnb_filter():
     """ HBNB filters """
-    states = storage.all(State).values()
+    states = storage.all(State, "cities").values()
     states = sorted(states, key=lambda k: k.name)
     st_ct = []
 